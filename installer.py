@@ -4,63 +4,174 @@ Installer script for Screenshot Utility
 """
 import os
 import sys
+import ctypes
+import ctypes.util
+import plistlib
 import subprocess
 import shutil
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
+from typing import Optional
 
 APP_NAME = "Screenshot Utility"
 APP_IDENTIFIER = "com.user.screenshotutil"
 SERVICE_PLIST_NAME = f"{APP_IDENTIFIER}.plist"
+APP_BUNDLE_NAME = f"{APP_NAME}.app"
+LAUNCH_AGENTS_DIR = os.path.expanduser("~/Library/LaunchAgents")
+PREFERENCES_PATH = os.path.expanduser("~/.screenshot_util_preferences.json")
+
+# Launch agent definition; ProgramArguments is filled in at install time
+LAUNCH_AGENT_TEMPLATE = {
+    "Label": APP_IDENTIFIER,
+    "ProgramArguments": [],
+    "RunAtLoad": True,
+    "KeepAlive": {"SuccessfulExit": False},
+    "ProcessType": "Interactive",
+    "ThrottleInterval": 5,
+}
+
+@lru_cache(maxsize=None)
+def _exists(path):
+    """Cached os.path.exists; call _exists.cache_clear() after changing the filesystem"""
+    return os.path.exists(path)
+
+def _list_dir(path):
+    """Return the set of entry names in a directory, or an empty set if it can't be read"""
+    try:
+        with os.scandir(path) as entries:
+            return {entry.name for entry in entries}
+    except OSError:
+        return set()
+
+def _load_clonefile():
+    """Return libc's clonefile(2) on macOS, or None where it isn't available"""
+    if sys.platform != "darwin":
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        clonefile = libc.clonefile
+    except (OSError, AttributeError):
+        return None
+    clonefile.argtypes = [ctypes.c_char_p, ctypes.c_char_p, ctypes.c_int]
+    clonefile.restype = ctypes.c_int
+    return clonefile
+
+_clonefile = _load_clonefile()
+
+def _parallel_copytree(src, dst, max_workers=8):
+    """Copy a directory tree, spreading the per-file copies over a thread pool.
+    
+    App bundles contain thousands of small files where per-file open/close
+    latency dominates, so overlapping the copies is much faster than the
+    sequential loop in shutil.copytree. Symlinks are recreated, not followed.
+    """
+    os.makedirs(dst)
+    futures = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for root, dirs, files in os.walk(src):
+            dst_root = os.path.normpath(os.path.join(dst, os.path.relpath(root, src)))
+            for name in list(dirs):
+                src_path = os.path.join(root, name)
+                dst_path = os.path.join(dst_root, name)
+                if os.path.islink(src_path):
+                    os.symlink(os.readlink(src_path), dst_path)
+                    dirs.remove(name)
+                else:
+                    os.makedirs(dst_path, exist_ok=True)
+            for name in files:
+                src_path = os.path.join(root, name)
+                dst_path = os.path.join(dst_root, name)
+                if os.path.islink(src_path):
+                    os.symlink(os.readlink(src_path), dst_path)
+                else:
+                    futures.append(executor.submit(shutil.copy2, src_path, dst_path))
+    
+    # Surface the first copy error, if any
+    for future in futures:
+        future.result()
+
+def _copy_bundle(src, dst):
+    """Copy an app bundle to dst, using an APFS copy-on-write clone when possible"""
+    if _clonefile is not None:
+        if _clonefile(os.fsencode(src), os.fsencode(dst), 0) == 0:
+            return
+        print(f"clonefile failed ({os.strerror(ctypes.get_errno())}), falling back to a full copy")
+        if os.path.exists(dst):
+            shutil.rmtree(dst)
+    _parallel_copytree(src, dst)
 
 def get_app_path():
     """Get the path to the application bundle if it exists"""
-    # Look in standard locations
-    app_path = f"/Applications/{APP_NAME}.app"
-    user_app_path = os.path.expanduser(f"~/Applications/{APP_NAME}.app")
+    # Look in standard locations, then in a local dist directory - one directory read each
+    search_dirs = [
+        "/Applications",
+        os.path.expanduser("~/Applications"),
+        "dist",
+    ]
     
-    if os.path.exists(app_path):
-        return app_path
-    elif os.path.exists(user_app_path):
-        return user_app_path
-    else:
-        # Check if we have a dist directory with the app
-        dist_app_path = f"dist/{APP_NAME}.app"
-        if os.path.exists(dist_app_path):
-            return os.path.abspath(dist_app_path)
+    for directory in search_dirs:
+        if APP_BUNDLE_NAME in _list_dir(directory):
+            return os.path.abspath(os.path.join(directory, APP_BUNDLE_NAME))
     
     return None
 
 def install_application():
     """Install the application to Applications folder"""
     # Check if we have a packaged app
-    dist_app_path = f"dist/{APP_NAME}.app"
+    dist_app_path = f"dist/{APP_BUNDLE_NAME}"
     
-    if not os.path.exists(dist_app_path):
+    if not _exists(dist_app_path):
         print("Application bundle not found. Creating one...")
         try:
             subprocess.run([sys.executable, "package.py"], check=True)
         except subprocess.CalledProcessError as e:
             print(f"Error packaging application: {e}")
             return False
+        finally:
+            _exists.cache_clear()
     
     # Copy to Applications folder
-    app_path = f"/Applications/{APP_NAME}.app"
+    app_path = f"/Applications/{APP_BUNDLE_NAME}"
+    
+    # Stage the copy next to the destination so the swap is a rename
+    staging_path = f"{app_path}.installing"
+    previous_path = f"{app_path}.previous"
+    moved_aside = False
     
     try:
-        # Remove existing app if it exists
-        if os.path.exists(app_path):
-            print(f"Removing existing installation at {app_path}")
-            shutil.rmtree(app_path)
+        # Clear out leftovers from an interrupted install
+        for stale_path in (staging_path, previous_path):
+            if _exists(stale_path):
+                shutil.rmtree(stale_path)
         
         # Copy the app
         print(f"Copying app to {app_path}")
-        shutil.copytree(dist_app_path, app_path)
+        _copy_bundle(dist_app_path, staging_path)
+        
+        # Swap the new bundle into place, keeping the old one until the rename succeeds
+        if _exists(app_path):
+            print(f"Replacing existing installation at {app_path}")
+            os.rename(app_path, previous_path)
+            moved_aside = True
+        os.replace(staging_path, app_path)
+        moved_aside = False
+        shutil.rmtree(previous_path, ignore_errors=True)
         
         print(f"Application installed successfully to {app_path}")
         return True
     except Exception as e:
         print(f"Error installing application: {e}")
+        # Restore the old bundle so a failed swap doesn't leave the app uninstalled
+        if moved_aside:
+            try:
+                os.rename(previous_path, app_path)
+            except OSError as restore_error:
+                print(f"Could not restore previous installation from {previous_path}: {restore_error}")
         return False
+    finally:
+        _exists.cache_clear()
 
 def install_launch_agent():
     """Install the launch agent for auto-start"""
@@ -72,43 +183,18 @@ def install_launch_agent():
     
     try:
         # Create the LaunchAgents directory if it doesn't exist
-        launch_agents_dir = os.path.expanduser("~/Library/LaunchAgents")
+        launch_agents_dir = LAUNCH_AGENTS_DIR
         os.makedirs(launch_agents_dir, exist_ok=True)
         
         # Get the executable path inside the app bundle
         executable_path = f"{app_path}/Contents/MacOS/{APP_NAME.replace(' ', '')}"
         
-        # Create the plist content
-        plist_content = f"""<?xml version="1.0" encoding="UTF-8"?>
-<!DOCTYPE plist PUBLIC "-//Apple//DTD PLIST 1.0//EN" "http://www.apple.com/DTDs/PropertyList-1.0.dtd">
-<plist version="1.0">
-<dict>
-    <key>Label</key>
-    <string>{APP_IDENTIFIER}</string>
-    <key>ProgramArguments</key>
-    <array>
-        <string>{executable_path}</string>
-        <string>--service</string>
-    </array>
-    <key>RunAtLoad</key>
-    <true/>
-    <key>KeepAlive</key>
-    <dict>
-        <key>SuccessfulExit</key>
-        <false/>
-    </dict>
-    <key>ProcessType</key>
-    <string>Interactive</string>
-    <key>ThrottleInterval</key>
-    <integer>5</integer>
-</dict>
-</plist>
-"""
-        
         # Write the plist file
         plist_path = os.path.join(launch_agents_dir, SERVICE_PLIST_NAME)
-        with open(plist_path, "w") as f:
-            f.write(plist_content)
+        plist = dict(LAUNCH_AGENT_TEMPLATE, ProgramArguments=[executable_path, "--service"])
+        with open(plist_path, "wb") as f:
+            plistlib.dump(plist, f, fmt=plistlib.FMT_BINARY)
+        _exists.cache_clear()
         
         # Load the launch agent
         subprocess.run(["launchctl", "load", plist_path], check=True)
@@ -124,7 +210,7 @@ def remove_launch_agent():
     """Remove the launch agent"""
     try:
         # Get the path to the plist file
-        plist_path = os.path.expanduser(f"~/Library/LaunchAgents/{SERVICE_PLIST_NAME}")
+        plist_path = os.path.join(LAUNCH_AGENTS_DIR, SERVICE_PLIST_NAME)
         
         # Check if it exists
         if not os.path.exists(plist_path):
@@ -136,6 +222,7 @@ def remove_launch_agent():
         
         # Remove the plist file
         os.remove(plist_path)
+        _exists.cache_clear()
         
         print(f"Launch agent removed from {plist_path}")
         print("The application will no longer start automatically at login")
@@ -162,7 +249,7 @@ def uninstall_application():
         shutil.rmtree(app_path)
         
         # Remove preferences
-        prefs_path = os.path.expanduser("~/.screenshot_util_preferences.json")
+        prefs_path = PREFERENCES_PATH
         if os.path.exists(prefs_path):
             os.remove(prefs_path)
             print(f"Removed preferences file {prefs_path}")
@@ -172,13 +259,37 @@ def uninstall_application():
     except Exception as e:
         print(f"Error uninstalling application: {e}")
         return False
+    finally:
+        _exists.cache_clear()
+
+@dataclass
+class InstallerState:
+    """Snapshot of what the installer has placed on disk"""
+    app_path: Optional[str]
+    plist_installed: bool
+    
+    @property
+    def app_installed(self):
+        """Whether an application bundle was found"""
+        return self.app_path is not None
+
+def _snapshot():
+    """Capture the current install state with one directory read per location"""
+    return InstallerState(
+        app_path=get_app_path(),
+        plist_installed=SERVICE_PLIST_NAME in _list_dir(LAUNCH_AGENTS_DIR),
+    )
 
 def show_menu():
     """Show the installer menu"""
+    state = _snapshot()
     while True:
+        app_marker = " [installed]" if state.app_installed else ""
+        agent_marker = " [enabled]" if state.plist_installed else ""
+        
         print("\n==== Screenshot Utility Installer ====")
-        print("1. Install Application")
-        print("2. Enable Auto-Launch at Login")
+        print(f"1. Install Application{app_marker}")
+        print(f"2. Enable Auto-Launch at Login{agent_marker}")
         print("3. Disable Auto-Launch at Login")
         print("4. Uninstall Application")
         print("5. Exit")
@@ -198,6 +309,11 @@ def show_menu():
             break
         else:
             print("Invalid choice. Please enter a number between 1 and 5.")
+            input("\nPress Enter to continue...")
+            continue
+        
+        # Only refresh the snapshot after an action that may have changed the disk
+        state = _snapshot()
         
         input("\nPress Enter to continue...")
 
@@ -4,14 +4,46 @@ Script to package the Screenshot Utility as a macOS application
 """
 import os
 import sys
+import glob
 import shutil
+import hashlib
 import subprocess
+import importlib.util
 from setuptools import setup
 
 APP_NAME = "Screenshot Utility"
 APP_VERSION = "2.0.0"
 APP_AUTHOR = "Your Name"
 APP_ICON = "appicon.icns"  # Place an icon file in the project root or specify path
+APP_SCRIPT = "run_service.py"
+BUILD_HASH_PATH = "dist/.build_hash"
+
+# Check for py2app without importing it; setup() loads it when building
+HAVE_PY2APP = importlib.util.find_spec("py2app") is not None
+
+def compute_build_hash(setup_options):
+    """Hash everything that goes into the bundle so unchanged builds can be skipped.
+    
+    Args:
+        setup_options: The py2app options dictionary used for the build
+        
+    Returns:
+        str: Hex digest over the source files, icon, build scripts,
+        requirements, and build options
+    """
+    inputs = sorted(glob.glob("src/**/*.py", recursive=True) + ["run.py", APP_SCRIPT])
+    # The build logic and pinned dependencies shape the bundle as much as the sources
+    for path in (APP_ICON, "package.py", "setup.py", "requirements.txt"):
+        if os.path.exists(path):
+            inputs.append(path)
+    
+    digest = hashlib.blake2b()
+    for path in inputs:
+        digest.update(path.encode())
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    digest.update(repr(setup_options).encode())
+    return digest.hexdigest()
 
 def create_app_bundle():
     """Create a macOS .app bundle"""
@@ -23,18 +55,10 @@ def create_app_bundle():
         print(f"Packaging {APP_NAME} as a macOS application...")
         
         # Check if we have py2app installed
-        try:
-            import py2app
-        except ImportError:
+        if not HAVE_PY2APP:
             print("Installing py2app...")
             subprocess.check_call([sys.executable, "-m", "pip", "install", "py2app"])
         
-        # Clean build directories if they exist
-        if os.path.exists("build"):
-            shutil.rmtree("build")
-        if os.path.exists("dist"):
-            shutil.rmtree("dist")
-        
         # First, create a setup.py configuration for py2app
         setup_options = {
             'argv_emulation': True,
@@ -52,7 +76,7 @@ def create_app_bundle():
                 'NSAppleEventsUsageDescription': "This app requires permission to control other apps for screen recording.",
                 'LSUIElement': True,  # App is an agent (menu bar app without dock icon)
             },
-            'packages': ['rumps', 'PyQt6', 'PIL', 'pynput'],
+            'packages': ['rumps', 'PyQt6', 'PIL', 'Quartz', 'AppKit', 'Foundation', 'orjson'],
             'includes': ['src'],
             'resources': [],
         }
@@ -61,11 +85,25 @@ def create_app_bundle():
         if os.path.exists(APP_ICON):
             setup_options['iconfile'] = APP_ICON
         
+        # Skip the rebuild entirely if nothing has changed since the last one
+        build_hash = compute_build_hash(setup_options)
+        if os.path.exists(BUILD_HASH_PATH) and os.path.exists(f"dist/{APP_NAME}.app"):
+            with open(BUILD_HASH_PATH) as f:
+                if f.read().strip() == build_hash:
+                    print(f"dist/{APP_NAME}.app is up to date")
+                    return True
+        
+        # Clean build directories if they exist
+        if os.path.exists("build"):
+            shutil.rmtree("build")
+        if os.path.exists("dist"):
+            shutil.rmtree("dist")
+        
         # Run py2app
         sys.argv = [sys.argv[0], 'py2app']
         setup(
             name=APP_NAME,
-            app=['run.py'],
+            app=[APP_SCRIPT],
             version=APP_VERSION,
             options={'py2app': setup_options},
             setup_requires=['py2app'],
@@ -73,22 +111,9 @@ def create_app_bundle():
         
         print(f"App bundle created at: dist/{APP_NAME}.app")
         
-        # Add run with service flag
-        app_exec_path = f"dist/{APP_NAME}.app/Contents/MacOS/{APP_NAME.replace(' ', '')}"
-        if os.path.exists(app_exec_path):
-            # Read existing file
-            with open(app_exec_path, 'r') as f:
-                content = f.read()
-            
-            # Add service flag if it doesn't already have it
-            if "--service" not in content:
-                content = content.replace("if __name__ == '__main__':", "if __name__ == '__main__':\n    sys.argv.append('--service')")
-                
-                # Write updated file
-                with open(app_exec_path, 'w') as f:
-                    f.write(content)
-                
-                print("Updated executable to run in service mode")
+        # Record the inputs of this build
+        with open(BUILD_HASH_PATH, "w") as f:
+            f.write(build_hash)
         
         print("Packaging completed successfully!")
         print(f"To run the app, open dist/{APP_NAME}.app")
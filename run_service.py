@@ -0,0 +1,10 @@
+#!/usr/bin/env python3
+"""
+Entry script for the packaged Screenshot Utility, which always runs as a service
+"""
+import sys
+
+if __name__ == "__main__":
+    sys.argv.append("--service")
+    from src.main import main
+    main()
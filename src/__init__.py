@@ -5,4 +5,4 @@ A utility for capturing and annotating screenshots on macOS.
 Provides both a standalone application and a menu bar service.
 """
 # Package version
-__version__ = "2.0.8"
\ No newline at end of file
+__version__ = "2.0.115"
\ No newline at end of file
@@ -2,17 +2,49 @@
 """
 Annotation Window Module for annotating captured screenshots
 """
-import pyperclip
-from PIL import Image
+from collections import deque
+from itertools import islice
 from PyQt6.QtWidgets import QApplication
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
     QToolBar, QColorDialog, QFileDialog, QMessageBox
 )
 from PyQt6.QtGui import (
-    QPixmap, QPainter, QPen, QColor, QIcon, QImage, QAction
+    QPixmap, QPainter, QPen, QColor, QIcon, QImage, QAction, QPainterPath
 )
-from PyQt6.QtCore import Qt, QPoint, QSize
+from PyQt6.QtCore import Qt, QPoint, QSize, QRect, QRectF, QTimer
+from src.geometry import ARROW_HEAD_LENGTH, arrow_points, padded_bounds
+from src.native_capture import DEVICE_PIXEL_RATIO_KEY
+
+# QPixmap.save quality for PNG files. Qt turns it into zlib level
+# (100 - quality) * 9 // 91, so 80 means level 1: much faster than the
+# default level for a slightly larger file.
+PNG_SAVE_QUALITY = 80
+
+
+def pil_to_qimage(image):
+    """Wrap a PIL Image's pixels in a QImage.
+    
+    The pixels are packed into a single buffer (one copy, done in Pillow's C
+    encoder) which the QImage references directly instead of copying again.
+    RGB images keep their 3-byte layout and are wrapped as Format_RGB888, so
+    any per-pixel swizzling is left to Qt's vectorized format conversion
+    rather than being done up front.
+    
+    Args:
+        image: The PIL Image to convert
+        
+    Returns:
+        tuple: (QImage, bytes) - the QImage borrows the returned buffer, so the
+        caller must keep the buffer alive for as long as the QImage is used
+    """
+    if image.mode == "RGB":
+        data = image.tobytes()
+        return QImage(data, image.width, image.height, image.width * 3, QImage.Format.Format_RGB888), data
+    
+    data = image.tobytes() if image.mode == "RGBA" else image.convert("RGBA").tobytes()
+    return QImage(data, image.width, image.height, image.width * 4, QImage.Format.Format_RGBA8888), data
+
 
 class DrawingArea(QWidget):
     """Widget for drawing annotations on screenshots"""
@@ -21,35 +53,43 @@ class DrawingArea(QWidget):
         super().__init__(parent)
         self.screenshot = screenshot
         
-        print(f"Drawing area initializing with screenshot type: {type(screenshot)}")
-        
-        # Convert PIL Image to QPixmap
+        # Convert the screenshot to a QPixmap. Captures that already come from
+        # Qt get a handle of our own, sharing pixels until we first paint on
+        # it, so old history baked into it never touches the caller's pixmap.
+        # PIL images are wrapped without a second copy.
         try:
-            # Ensure we have an RGB or RGBA mode image
-            if screenshot.mode not in ['RGB', 'RGBA']:
-                print(f"Converting image from {screenshot.mode} to RGBA")
-                img = screenshot.convert("RGBA")
+            if isinstance(screenshot, QPixmap):
+                self.pixmap = QPixmap(screenshot)
+            elif isinstance(screenshot, QImage):
+                self.pixmap = QPixmap.fromImage(screenshot)
             else:
-                img = screenshot
+                # The QImage only borrows the buffer, so keep it alive until the pixmap exists
+                qimg, data = pil_to_qimage(screenshot)
+                if qimg.isNull():
+                    print(f"QImage is null after conversion from {screenshot.mode} image")
+                    
+                # Qt converts both RGBA8888 and RGB888 to its native pixmap
+                # format here, which writes the pixels into memory Qt owns.
+                # NoFormatConversion must not be used: the pixmap would then
+                # keep pointing into the borrowed buffer.
+                self.pixmap = QPixmap.fromImage(qimg)
                 
-            print(f"PIL Image size: {img.width}x{img.height}, mode: {img.mode}")
-            
-            # Get raw image data for conversion to QImage
-            img_data = img.tobytes("raw", "RGBA")
+                # The pixmap holds its own copy of the pixels, so release the
+                # packed buffer now rather than keeping it for the window's lifetime
+                del qimg, data
             
-            # Create QImage with correct stride
-            qimg = QImage(img_data, img.width, img.height, img.width * 4, QImage.Format.Format_RGBA8888)
-            if qimg.isNull():
-                print("QImage is null after conversion")
-            else:
-                print(f"QImage created: {qimg.width()}x{qimg.height()}")
-                
-            # Convert to QPixmap for drawing
-            self.pixmap = QPixmap.fromImage(qimg)
+            # Captures are in physical pixels. Qt images already carry their
+            # device pixel ratio and PIL captures record theirs, so the widget
+            # is laid out and painted in logical pixels on retina. Only a PIL
+            # image from elsewhere falls back to the primary screen's ratio.
+            if not isinstance(screenshot, (QPixmap, QImage)):
+                ratio = screenshot.info.get(DEVICE_PIXEL_RATIO_KEY)
+                if ratio is None:
+                    screen = QApplication.primaryScreen()
+                    ratio = screen.devicePixelRatio() if screen is not None else 1.0
+                self.pixmap.setDevicePixelRatio(ratio)
             if self.pixmap.isNull():
-                print("QPixmap is null after conversion from QImage")
-            else:
-                print(f"QPixmap created: {self.pixmap.width()}x{self.pixmap.height()}")
+                print(f"QPixmap is null after conversion from {type(screenshot)}")
         except Exception as e:
             import traceback
             print(f"Error converting screenshot to QPixmap: {e}")
@@ -60,22 +100,37 @@ class DrawingArea(QWidget):
             print("Created fallback empty pixmap")
             
         # Initialize drawing properties
-        self.last_point = QPoint()
         self.drawing = False
         self.preview_pixmap = None  # For temporary drawing preview
         self.pen_color = QColor(255, 0, 0)  # Default: Red
         self.pen_width = 2
+        self._rebuild_pens()
         self.tool = "pen"  # Default tool
         self.start_point = QPoint()  # For shape tools
         self.current_point = QPoint()  # For tracking current mouse position
-        
-        # History for undo/redo
-        self.history = [self.pixmap.copy()]
+        self._dirty_rect = QRect()  # Pending repaint area, flushed by _paint_timer
+        
+        # Move events can arrive far faster than the display refreshes, so
+        # repaints they trigger are batched on a short single-shot timer
+        self._paint_timer = QTimer(self)
+        self._paint_timer.setSingleShot(True)
+        self._paint_timer.setInterval(8)
+        self._paint_timer.timeout.connect(self._flush_update)
+        
+        # Annotations are painted on a transparent overlay above the screenshot,
+        # so the screenshot itself is never copied while drawing
+        self.overlay = QPixmap(self.pixmap.size())
+        self.overlay.setDevicePixelRatio(self.pixmap.devicePixelRatio())
+        self.overlay.fill(Qt.GlobalColor.transparent)
+        
+        # History for undo/redo. Only the drawing commands are stored; the
+        # overlay is rebuilt by replaying them.
+        self.history = deque(maxlen=20)
         self.history_index = 0
+        self.current_path = QPainterPath()  # Pen stroke in progress
         
-        # Set fixed size based on screenshot
-        print(f"Setting drawing area size to: {self.pixmap.width()}x{self.pixmap.height()}")
-        self.setFixedSize(self.pixmap.size())
+        # Set fixed size based on screenshot, in logical pixels
+        self.setFixedSize(self.pixmap.deviceIndependentSize().toSize())
     
     def set_tool(self, tool):
         """Set the current drawing tool"""
@@ -84,104 +139,56 @@ class DrawingArea(QWidget):
     def set_pen_color(self, color):
         """Set the pen color"""
         self.pen_color = color
+        self._rebuild_pens()
     
     def set_pen_width(self, width):
         """Set the pen width"""
         self.pen_width = width
+        self._rebuild_pens()
+    
+    def _rebuild_pens(self):
+        """Create the drawing and preview pens for the current color and width"""
+        self._solid_pen = QPen(self.pen_color, self.pen_width, Qt.PenStyle.SolidLine,
+                               Qt.PenCapStyle.RoundCap, Qt.PenJoinStyle.RoundJoin)
+        self._dash_pen = QPen(self._solid_pen)
+        self._dash_pen.setStyle(Qt.PenStyle.DashLine)
     
     def paintEvent(self, event):
         """Handle paint events to draw the image and annotations"""
         painter = QPainter(self)
         
-        # Draw the base image with annotations
-        painter.drawPixmap(0, 0, self.pixmap)
+        # Draw only the exposed part of the image with annotations. The
+        # source rect is in the pixmaps' physical pixels.
+        rect = event.rect()
+        ratio = self.pixmap.devicePixelRatio()
+        source = QRectF(rect.x() * ratio, rect.y() * ratio, rect.width() * ratio, rect.height() * ratio)
+        painter.drawPixmap(QRectF(rect), self.pixmap, source)
+        painter.drawPixmap(QRectF(rect), self.overlay, source)
+        
+        # The pen stroke in progress is only drawn on the widget until the
+        # mouse is released, when it is painted into the pixmap once
+        if self.drawing and self.tool == "pen":
+            painter.setPen(self._solid_pen)
+            painter.drawPath(self.current_path)
         
         # If we're drawing a shape, draw the preview on top
         if self.drawing and self.tool != "pen" and not self.start_point.isNull() and not self.current_point.isNull():
-            # Create a temporary painter on the widget (not the pixmap)
-            pen = QPen(self.pen_color, self.pen_width, Qt.PenStyle.SolidLine,
-                      Qt.PenCapStyle.RoundCap, Qt.PenJoinStyle.RoundJoin)
-            pen.setStyle(Qt.PenStyle.DashLine)  # Use dashed line for preview
-            painter.setPen(pen)
+            # Use dashed line for preview
+            painter.setPen(self._dash_pen)
             
             # Draw preview based on current tool
             if self.tool == "line":
                 painter.drawLine(self.start_point, self.current_point)
             elif self.tool == "rectangle":
-                x = min(self.start_point.x(), self.current_point.x())
-                y = min(self.start_point.y(), self.current_point.y())
-                width = abs(self.start_point.x() - self.current_point.x())
-                height = abs(self.start_point.y() - self.current_point.y())
-                painter.drawRect(x, y, width, height)
+                self._draw_rectangle(painter, self.start_point, self.current_point)
             elif self.tool == "arrow":
-                # Calculate arrow head and stem
-                arrow_length = 20
-                arrow_width = self.pen_width * 3  # Width for the stem of the arrow
-                dx = self.current_point.x() - self.start_point.x()
-                dy = self.current_point.y() - self.start_point.y()
-                
-                # Normalize
-                length = (dx**2 + dy**2)**0.5
-                if length > 0:  # Avoid division by zero
-                    dx /= length
-                    dy /= length
-                    
-                    # Calculate perpendicular direction for arrow stem width
-                    perpx = -dy
-                    perpy = dx
-                    
-                    # Calculate arrow head points
-                    p1 = QPoint(
-                        int(self.current_point.x() - arrow_length * (dx * 0.866 + dy * 0.5)),
-                        int(self.current_point.y() - arrow_length * (dy * 0.866 - dx * 0.5))
-                    )
-                    
-                    p2 = QPoint(
-                        int(self.current_point.x() - arrow_length * (dx * 0.866 - dy * 0.5)),
-                        int(self.current_point.y() - arrow_length * (dy * 0.866 + dx * 0.5))
-                    )
-                    
-                    # Calculate points for the stem
-                    stem_width = arrow_width / 2
-                    
-                    # Start points (widened to create stem)
-                    s1 = QPoint(
-                        int(self.start_point.x() + stem_width * perpx),
-                        int(self.start_point.y() + stem_width * perpy)
-                    )
-                    
-                    s2 = QPoint(
-                        int(self.start_point.x() - stem_width * perpx),
-                        int(self.start_point.y() - stem_width * perpy)
-                    )
-                    
-                    # Connection points where stem meets the arrow head
-                    c1 = QPoint(
-                        int(self.current_point.x() - arrow_length * dx + stem_width * perpx),
-                        int(self.current_point.y() - arrow_length * dy + stem_width * perpy)
-                    )
-                    
-                    c2 = QPoint(
-                        int(self.current_point.x() - arrow_length * dx - stem_width * perpx),
-                        int(self.current_point.y() - arrow_length * dy - stem_width * perpy)
-                    )
-                    
-                    # Set brush for filling
-                    painter.setBrush(QColor(self.pen_color))
-                    
-                    # Draw the stem as a polygon
-                    stem_points = [s1, c1, c2, s2]
-                    painter.drawPolygon(stem_points)
-                    
-                    # Create and fill a polygon for the arrow head
-                    head_points = [self.current_point, p1, p2]
-                    painter.drawPolygon(head_points)
+                self._draw_arrow(painter, self.start_point, self.current_point, self.pen_color, self.pen_width)
     
     def mousePressEvent(self, event):
         """Handle mouse press events to start drawing"""
         if event.button() == Qt.MouseButton.LeftButton:
-            self.last_point = event.pos()
             self.drawing = True
+            self.current_path = QPainterPath(event.position())
             
             # Store start position for all tools
             self.start_point = event.pos()
@@ -190,136 +197,112 @@ class DrawingArea(QWidget):
     def mouseMoveEvent(self, event):
         """Handle mouse move events for drawing"""
         if event.buttons() & Qt.MouseButton.LeftButton and self.drawing:
+            previous_point = self.current_point
             self.current_point = event.pos()
             
-            # For pen tool, draw directly to the pixmap
+            # For pen tool, extend the stroke and repaint only the new segment
             if self.tool == "pen":
-                self._draw_line_to(event.pos())
+                last = self.current_path.currentPosition()
+                position = event.position()
+                self.current_path.lineTo(position)
+                self._schedule_update(QRect(*padded_bounds(
+                    ((last.x(), last.y()), (position.x(), position.y())), self.pen_width)))
             else:
-                # For shape tools, just update to show the preview
-                self.update()
+                # For shape tools, repaint the old and new preview areas, which
+                # both span from the start point. The margin covers the arrow
+                # head, which reaches past the end point.
+                self._schedule_update(QRect(*padded_bounds(
+                    ((self.start_point.x(), self.start_point.y()),
+                     (previous_point.x(), previous_point.y()),
+                     (self.current_point.x(), self.current_point.y())),
+                    ARROW_HEAD_LENGTH + self.pen_width)))
     
     def mouseReleaseEvent(self, event):
         """Handle mouse release events to complete drawing"""
         if event.button() == Qt.MouseButton.LeftButton and self.drawing:
             if self.tool == "pen":
-                self._draw_line_to(event.pos())
-            elif self.tool == "line":
-                self._draw_line(self.start_point, event.pos())
-            elif self.tool == "arrow":
-                self._draw_arrow(self.start_point, event.pos())
-            elif self.tool == "rectangle":
-                self._draw_rectangle(self.start_point, event.pos())
+                self.current_path.lineTo(event.position())
+                command = self._make_command(path=self.current_path)
+            else:
+                command = self._make_command(start=QPoint(self.start_point), end=event.pos())
             
             self.drawing = False
+            self.current_path = QPainterPath()
+            self._apply_command(command)
             
             # Add to history for undo/redo
-            self._add_to_history()
+            self._add_to_history(command)
     
-    def _draw_line_to(self, end_point):
-        """Draw a line from last point to current point"""
-        painter = QPainter(self.pixmap)
-        pen = QPen(self.pen_color, self.pen_width, Qt.PenStyle.SolidLine, 
-                   Qt.PenCapStyle.RoundCap, Qt.PenJoinStyle.RoundJoin)
-        painter.setPen(pen)
-        painter.drawLine(self.last_point, end_point)
+    def _make_command(self, **geometry):
+        """Build a history entry for the current tool and pen settings"""
+        command = {"tool": self.tool, "pen": self._solid_pen}
+        command.update(geometry)
+        return command
+    
+    def _schedule_update(self, rect):
+        """Queue a repaint of rect, merging all requests made while the paint timer runs.
+        
+        Fast mouse movement can deliver many move events per frame; collecting
+        their dirty rects into a single update() keeps repaints bounded by what
+        the display can actually show.
         
-        # Update last point
-        self.last_point = end_point
+        Args:
+            rect: The QRect that needs repainting
+        """
+        if not self._paint_timer.isActive():
+            self._paint_timer.start()
+        self._dirty_rect = self._dirty_rect.united(rect)
+    
+    def _flush_update(self):
+        """Repaint the area collected by _schedule_update"""
+        rect = self._dirty_rect
+        self._dirty_rect = QRect()
+        self.update(rect)
+    
+    def _apply_command(self, command):
+        """Paint a single history command onto the annotation overlay"""
+        painter = QPainter(self.overlay)
+        self._paint_command(painter, command)
+        painter.end()
         self.update()
     
-    def _draw_line(self, start_point, end_point):
-        """Draw a straight line from start to end"""
-        painter = QPainter(self.pixmap)
-        pen = QPen(self.pen_color, self.pen_width, Qt.PenStyle.SolidLine,
-                   Qt.PenCapStyle.RoundCap, Qt.PenJoinStyle.RoundJoin)
+    def _paint_command(self, painter, command):
+        """Paint a history command with the given painter.
+        
+        Args:
+            painter: An active QPainter on the target pixmap
+            command: A dict created by _make_command
+        """
+        pen = command["pen"]
         painter.setPen(pen)
-        painter.drawLine(start_point, end_point)
-        self.update()
+        painter.setBrush(Qt.BrushStyle.NoBrush)
+        
+        tool = command["tool"]
+        if tool == "pen":
+            painter.drawPath(command["path"])
+        elif tool == "line":
+            painter.drawLine(command["start"], command["end"])
+        elif tool == "arrow":
+            self._draw_arrow(painter, command["start"], command["end"], pen.color(), pen.width())
+        elif tool == "rectangle":
+            self._draw_rectangle(painter, command["start"], command["end"])
     
-    def _draw_arrow(self, start_point, end_point):
+    def _draw_arrow(self, painter, start_point, end_point, color, pen_width):
         """Draw an arrow from start to end"""
-        painter = QPainter(self.pixmap)
-        pen = QPen(self.pen_color, self.pen_width, Qt.PenStyle.SolidLine,
-                   Qt.PenCapStyle.RoundCap, Qt.PenJoinStyle.RoundJoin)
-        painter.setPen(pen)
-        
-        # Calculate arrow head
-        arrow_length = 20
-        arrow_width = self.pen_width * 3  # Width for the stem of the arrow
-        
-        # Calculate direction vector
-        dx = end_point.x() - start_point.x()
-        dy = end_point.y() - start_point.y()
-        
-        # Normalize
-        length = (dx**2 + dy**2)**0.5
-        if length == 0:
+        points = arrow_points(start_point.x(), start_point.y(), end_point.x(), end_point.y(), pen_width)
+        if points is None:
             return
-        
-        dx /= length
-        dy /= length
-        
-        # Calculate perpendicular direction for arrow stem width
-        perpx = -dy
-        perpy = dx
-        
-        # Calculate arrow head points
-        p1 = QPoint(
-            int(end_point.x() - arrow_length * (dx * 0.866 + dy * 0.5)),
-            int(end_point.y() - arrow_length * (dy * 0.866 - dx * 0.5))
-        )
-        
-        p2 = QPoint(
-            int(end_point.x() - arrow_length * (dx * 0.866 - dy * 0.5)),
-            int(end_point.y() - arrow_length * (dy * 0.866 + dx * 0.5))
-        )
-        
-        # Calculate points for the stem
-        stem_width = arrow_width / 2
-        
-        # Start points (widened to create stem)
-        s1 = QPoint(
-            int(start_point.x() + stem_width * perpx),
-            int(start_point.y() + stem_width * perpy)
-        )
-        
-        s2 = QPoint(
-            int(start_point.x() - stem_width * perpx),
-            int(start_point.y() - stem_width * perpy)
-        )
-        
-        # Connection points where stem meets the arrow head
-        c1 = QPoint(
-            int(end_point.x() - arrow_length * dx + stem_width * perpx),
-            int(end_point.y() - arrow_length * dy + stem_width * perpy)
-        )
-        
-        c2 = QPoint(
-            int(end_point.x() - arrow_length * dx - stem_width * perpx),
-            int(end_point.y() - arrow_length * dy - stem_width * perpy)
-        )
+        stem, head = points
         
         # Set the brush to fill the shape
-        painter.setBrush(QColor(self.pen_color))
-        
-        # Draw the stem as a polygon
-        stem_points = [s1, c1, c2, s2]
-        painter.drawPolygon(stem_points)
+        painter.setBrush(QColor(color))
         
-        # Create and fill a polygon for the arrow head
-        head_points = [end_point, p1, p2]
-        painter.drawPolygon(head_points)
-        
-        self.update()
+        # Draw the stem and the arrow head as filled polygons
+        painter.drawPolygon([QPoint(x, y) for x, y in stem])
+        painter.drawPolygon([QPoint(x, y) for x, y in head])
     
-    def _draw_rectangle(self, start_point, end_point):
+    def _draw_rectangle(self, painter, start_point, end_point):
         """Draw a rectangle from start to end"""
-        painter = QPainter(self.pixmap)
-        pen = QPen(self.pen_color, self.pen_width, Qt.PenStyle.SolidLine,
-                   Qt.PenCapStyle.RoundCap, Qt.PenJoinStyle.RoundJoin)
-        painter.setPen(pen)
-        
         # Calculate rectangle
         x = min(start_point.x(), end_point.x())
         y = min(start_point.y(), end_point.y())
@@ -327,46 +310,69 @@ class DrawingArea(QWidget):
         height = abs(start_point.y() - end_point.y())
         
         painter.drawRect(x, y, width, height)
-        self.update()
     
-    def _add_to_history(self):
-        """Add current state to history for undo/redo functionality.
+    def _add_to_history(self, command):
+        """Add a drawing command to history for undo/redo functionality.
         
         Updates the history list by:
         1. Removing any forward history beyond the current index
-        2. Adding the current pixmap state to history
-        3. Limiting history size to maximum 20 items to conserve memory
+        2. Adding the command to history
+        3. Limiting history size to maximum 20 commands; the oldest command
+           is painted into the screenshot once it falls off the end
+        
+        Args:
+            command: A dict created by _make_command
         """
         # Remove any forward history
-        while len(self.history) > self.history_index + 1:
+        while len(self.history) > self.history_index:
             self.history.pop()
         
-        # Add current state
-        self.history.append(self.pixmap.copy())
-        self.history_index += 1
+        # The deque drops its oldest command on append once full, so keep
+        # that command's drawing by painting it into the screenshot first
+        if len(self.history) == self.history.maxlen:
+            painter = QPainter(self.pixmap)
+            self._paint_command(painter, self.history[0])
+            painter.end()
         
-        # Limit history size
-        if len(self.history) > 20:
-            self.history.pop(0)
-            self.history_index -= 1
+        # Add current command
+        self.history.append(command)
+        self.history_index = len(self.history)
+    
+    def _replay_history(self):
+        """Rebuild the annotation overlay from history"""
+        self.overlay.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(self.overlay)
+        for command in islice(self.history, self.history_index):
+            self._paint_command(painter, command)
+        painter.end()
+        self.update()
     
     def undo(self):
         """Undo the last drawing action"""
         if self.history_index > 0:
             self.history_index -= 1
-            self.pixmap = self.history[self.history_index].copy()
-            self.update()
+            self._replay_history()
     
     def redo(self):
         """Redo a previously undone action"""
-        if self.history_index < len(self.history) - 1:
+        if self.history_index < len(self.history):
             self.history_index += 1
-            self.pixmap = self.history[self.history_index].copy()
-            self.update()
+            self._apply_command(self.history[self.history_index - 1])
     
     def get_image(self):
-        """Get the image with annotations as a QPixmap"""
-        return self.pixmap.copy()
+        """Get the image with annotations as a QPixmap.
+        
+        Without any annotations this shares the screenshot's pixels instead
+        of copying them; Qt copies them if either side is painted on later.
+        """
+        if self.history_index == 0:
+            return QPixmap(self.pixmap)
+        
+        image = self.pixmap.copy()
+        painter = QPainter(image)
+        painter.drawPixmap(0, 0, self.overlay)
+        painter.end()
+        return image
 
 
 class AnnotationWindow(QMainWindow):
@@ -498,11 +504,9 @@ class AnnotationWindow(QMainWindow):
         # Get image with annotations
         pixmap = self.drawing_area.get_image()
         
-        # Convert QPixmap to QImage
-        image = pixmap.toImage()
-        
-        # Copy to clipboard
-        QApplication.clipboard().setImage(image)
+        # Copy to clipboard. The clipboard takes the pixmap as is and only
+        # converts it when another application asks for the data.
+        QApplication.clipboard().setPixmap(pixmap)
         
         # Show confirmation
         QMessageBox.information(self, "Success", "Screenshot copied to clipboard")
@@ -517,8 +521,9 @@ class AnnotationWindow(QMainWindow):
             # Get image with annotations
             pixmap = self.drawing_area.get_image()
             
-            # Save to file
-            pixmap.save(file_path)
+            # Save to file; JPEG keeps Qt's default quality
+            quality = PNG_SAVE_QUALITY if file_path.lower().endswith(".png") else -1
+            pixmap.save(file_path, None, quality)
             
             # Show confirmation
             QMessageBox.information(self, "Success", f"Screenshot saved to {file_path}")
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Geometry helpers for the annotation tools
+
+These work on plain numbers rather than Qt objects so the per-event math
+in the drawing code stays cheap and can be tested without a QApplication.
+"""
+import math
+
+# Length of the sides of an arrow head, in pixels
+ARROW_HEAD_LENGTH = 20
+
+# The arrow head's sides are the shaft direction rotated by +/-30 degrees
+_COS30, _SIN30 = 0.8660254037844387, 0.5
+
+
+def arrow_points(sx, sy, ex, ey, pen_width, head_length=ARROW_HEAD_LENGTH):
+    """Compute the outline of a filled arrow.
+
+    Args:
+        sx, sy: Start of the arrow
+        ex, ey: Tip of the arrow
+        pen_width: Pen width; the stem is three times as wide
+        head_length: Length of the head's sides
+
+    Returns:
+        tuple: (stem, head) lists of (x, y) integer points, or None if the
+        start and tip coincide
+    """
+    dx = ex - sx
+    dy = ey - sy
+    length = math.hypot(dx, dy)
+    if length == 0:
+        return None
+
+    dx /= length
+    dy /= length
+
+    # Offset of the stem edges, perpendicular to the arrow direction
+    stem_width = pen_width * 3 / 2
+    ox = -dy * stem_width
+    oy = dx * stem_width
+
+    # Where the stem meets the arrow head
+    bx = ex - head_length * dx
+    by = ey - head_length * dy
+
+    stem = [
+        (round(sx + ox), round(sy + oy)),
+        (round(bx + ox), round(by + oy)),
+        (round(bx - ox), round(by - oy)),
+        (round(sx - ox), round(sy - oy)),
+    ]
+    head = [
+        (ex, ey),
+        (round(ex - head_length * (dx * _COS30 + dy * _SIN30)),
+         round(ey - head_length * (dy * _COS30 - dx * _SIN30))),
+        (round(ex - head_length * (dx * _COS30 - dy * _SIN30)),
+         round(ey - head_length * (dy * _COS30 + dx * _SIN30))),
+    ]
+    return stem, head
+
+
+def padded_bounds(points, margin):
+    """Get the integer bounding box of some points, grown by a margin.
+
+    Args:
+        points: Iterable of (x, y) pairs; coordinates may be floats
+        margin: Amount to grow the box by on every side
+
+    Returns:
+        tuple: (x, y, width, height) covering every point plus the margin
+    """
+    xs, ys = zip(*points)
+    left = math.floor(min(xs)) - margin
+    top = math.floor(min(ys)) - margin
+    right = math.ceil(max(xs)) + margin
+    bottom = math.ceil(max(ys)) + margin
+    return left, top, right - left + 1, bottom - top + 1
@@ -3,10 +3,27 @@
 Generate an icon for the Screenshot Utility
 """
 import os
+import shutil
 import tempfile
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image, ImageDraw
 
+# Resolve the macOS icon tool once at import rather than on every build
+_ICONUTIL = shutil.which("iconutil")
+
+def _save_resized(img, size, output_path):
+    """Save one iconset entry, downscaled from the full-size icon.
+    
+    Args:
+        img: The 1024x1024 source PIL Image
+        size: Pixel size of the entry
+        output_path: Where to write the PNG
+    """
+    if img.width != size:
+        img = img.resize((size, size), Image.LANCZOS)
+    img.save(output_path, compress_level=1)
+
 def create_icon():
     """Create a simple camera icon for the app"""
     # Create a 1024x1024 image (Apple's recommended size for icons)
@@ -62,7 +79,7 @@ def create_icon():
     print(f"Icon saved as {png_path}")
     
     # Convert to ICNS if on macOS
-    if os.path.exists("/usr/bin/sips") and os.path.exists("/usr/bin/iconutil"):
+    if _ICONUTIL:
         try:
             icns_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "appicon.icns")
             
@@ -70,39 +87,33 @@ def create_icon():
             iconset_dir = tempfile.mkdtemp(suffix='.iconset')
             
             # Generate different size icons
+            jobs = []
             sizes = [16, 32, 64, 128, 256, 512, 1024]
             for size in sizes:
                 # Standard resolution
-                output_path = os.path.join(iconset_dir, f"icon_{size}x{size}.png")
-                subprocess.run([
-                    "sips",
-                    "-z", str(size), str(size),
-                    png_path,
-                    "--out", output_path
-                ], check=True, capture_output=True)
+                jobs.append((size, os.path.join(iconset_dir, f"icon_{size}x{size}.png")))
                 
                 # High resolution (retina)
                 if size <= 512:  # No 2048x2048 icon needed
-                    output_path = os.path.join(iconset_dir, f"icon_{size}x{size}@2x.png")
-                    subprocess.run([
-                        "sips",
-                        "-z", str(size*2), str(size*2),
-                        png_path,
-                        "--out", output_path
-                    ], check=True, capture_output=True)
+                    jobs.append((size * 2, os.path.join(iconset_dir, f"icon_{size}x{size}@2x.png")))
+            
+            # Resize from the image already in memory rather than re-reading the
+            # PNG per size. Pillow releases the GIL while resampling and
+            # encoding, so the sizes still run side by side.
+            with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+                list(executor.map(lambda job: _save_resized(img, *job), jobs))
             
             # Convert iconset to icns
             subprocess.run([
-                "iconutil",
+                _ICONUTIL,
                 "-c", "icns",
                 iconset_dir,
                 "-o", icns_path
-            ], check=True, capture_output=True)
+            ], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
             
             print(f"ICNS icon created at {icns_path}")
             
             # Clean up temporary directory
-            import shutil
             shutil.rmtree(iconset_dir)
             
             return icns_path
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Keyboard layout lookups for hotkey matching
+
+Event taps report physical key codes, which only correspond to the
+characters printed on the keys for a US layout. The mapping for the layout
+the user actually has is read through the Carbon Text Input Source and
+UCKeyTranslate APIs. pyobjc doesn't wrap these, so they're called through
+ctypes. Text Input Source functions must be called on the main thread.
+"""
+import ctypes
+import ctypes.util
+from functools import lru_cache
+
+# Distributed notification posted when the user switches keyboard layout
+LAYOUT_CHANGED_NOTIFICATION = "com.apple.Carbon.TISNotifySelectedKeyboardInputSourceChanged"
+
+# UCKeyTranslate arguments: translate for display, without dead key state
+_UC_KEY_ACTION_DISPLAY = 3
+_UC_KEY_TRANSLATE_NO_DEAD_KEYS = 1
+
+# Virtual key codes run from 0 to 127
+_KEY_CODE_COUNT = 128
+
+# Modifier state for UCKeyTranslate with Shift held (Carbon shiftKey >> 8)
+_SHIFT_KEY_STATE = 0x200 >> 8
+
+# Keypad key codes (kVK_ANSI_Keypad*). Laptops have no keypad, so these only
+# count for characters that no main keyboard key types.
+_KEYPAD_KEY_CODES = frozenset({
+    0x41, 0x43, 0x45, 0x47, 0x4B, 0x4C, 0x4E, 0x51,
+    0x52, 0x53, 0x54, 0x55, 0x56, 0x57, 0x58, 0x59, 0x5B, 0x5C,
+})
+_MAIN_KEY_CODES = tuple(code for code in range(_KEY_CODE_COUNT) if code not in _KEYPAD_KEY_CODES)
+
+
+@lru_cache(maxsize=None)
+def _frameworks():
+    """Load Carbon and CoreFoundation and declare the functions used from them"""
+    carbon = ctypes.cdll.LoadLibrary(ctypes.util.find_library("Carbon"))
+    cf = ctypes.cdll.LoadLibrary(ctypes.util.find_library("CoreFoundation"))
+
+    carbon.TISCopyCurrentASCIICapableKeyboardLayoutInputSource.argtypes = []
+    carbon.TISCopyCurrentASCIICapableKeyboardLayoutInputSource.restype = ctypes.c_void_p
+    carbon.TISGetInputSourceProperty.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
+    carbon.TISGetInputSourceProperty.restype = ctypes.c_void_p
+    carbon.LMGetKbdType.argtypes = []
+    carbon.LMGetKbdType.restype = ctypes.c_uint8
+    carbon.UCKeyTranslate.argtypes = [
+        ctypes.c_void_p,                    # keyLayoutPtr
+        ctypes.c_uint16,                    # virtualKeyCode
+        ctypes.c_uint16,                    # keyAction
+        ctypes.c_uint32,                    # modifierKeyState
+        ctypes.c_uint32,                    # keyboardType
+        ctypes.c_uint32,                    # keyTranslateOptions
+        ctypes.POINTER(ctypes.c_uint32),    # deadKeyState
+        ctypes.c_ulong,                     # maxStringLength
+        ctypes.POINTER(ctypes.c_ulong),     # actualStringLength
+        ctypes.POINTER(ctypes.c_uint16),    # unicodeString
+    ]
+    carbon.UCKeyTranslate.restype = ctypes.c_int32
+    cf.CFDataGetBytePtr.argtypes = [ctypes.c_void_p]
+    cf.CFDataGetBytePtr.restype = ctypes.c_void_p
+    cf.CFRelease.argtypes = [ctypes.c_void_p]
+    cf.CFRelease.restype = None
+
+    layout_data_key = ctypes.c_void_p.in_dll(carbon, "kTISPropertyUnicodeKeyLayoutData")
+    return carbon, cf, layout_data_key
+
+
+def character_key_codes():
+    """Map the characters of the current keyboard layout to their key codes.
+
+    The layout used is the current ASCII-capable one. This is the layout
+    macOS itself uses for keyboard shortcuts, so a hotkey still works while
+    a non-Latin layout such as Russian is selected. Must be called on the
+    main thread.
+
+    Main keyboard keys are read first without modifiers, then with Shift,
+    because some layouts put characters behind Shift (the digits on
+    AZERTY's top row, for example). Keypad keys only fill in what is still
+    missing after that.
+
+    Returns:
+        dict: Lowercase character -> virtual key code, for keys that type a
+        single character. Empty if the layout couldn't be read.
+    """
+    carbon, cf, layout_data_key = _frameworks()
+    source = carbon.TISCopyCurrentASCIICapableKeyboardLayoutInputSource()
+    if not source:
+        return {}
+    try:
+        layout_data = carbon.TISGetInputSourceProperty(source, layout_data_key)
+        if not layout_data:
+            return {}
+        layout = cf.CFDataGetBytePtr(layout_data)
+        keyboard_type = carbon.LMGetKbdType()
+
+        dead_key_state = ctypes.c_uint32()
+        length = ctypes.c_ulong()
+        chars = (ctypes.c_uint16 * 4)()
+        key_codes = {}
+        passes = ((_MAIN_KEY_CODES, 0), (_MAIN_KEY_CODES, _SHIFT_KEY_STATE), (sorted(_KEYPAD_KEY_CODES), 0))
+        for codes, modifier_state in passes:
+            for key_code in codes:
+                dead_key_state.value = 0
+                status = carbon.UCKeyTranslate(layout, key_code, _UC_KEY_ACTION_DISPLAY, modifier_state,
+                                               keyboard_type, _UC_KEY_TRANSLATE_NO_DEAD_KEYS,
+                                               ctypes.byref(dead_key_state), len(chars),
+                                               ctypes.byref(length), chars)
+                if status == 0 and length.value == 1:
+                    # Earlier passes win
+                    key_codes.setdefault(chr(chars[0]).lower(), key_code)
+        return key_codes
+    finally:
+        cf.CFRelease(source)
@@ -2,52 +2,48 @@
 """
 macOS Screenshot Utility - Main Application
 """
+import os
 import sys
 import argparse
-from PyQt6.QtWidgets import QApplication
-from src.screenshot_app import ScreenshotApp
+
+# Default capture shortcut; packagers can override it without editing code
+DEFAULT_SHORTCUT = os.environ.get("SCREENSHOT_UTIL_SHORTCUT", "Ctrl+Shift+4")
+
+# Single-instance lock for service mode
+LOCK_FILE_PATH = os.path.expanduser("~/Library/Caches/screenshot_util.lock")
 
 def main():
     """Main application entry point"""
     # Parse command line arguments
     parser = argparse.ArgumentParser(description='macOS Screenshot Utility')
-    parser.add_argument('--shortcut', default='Ctrl+Shift+4', 
-                        help='Keyboard shortcut for capturing screenshots (default: Ctrl+Shift+4)')
+    parser.add_argument('--shortcut', default=DEFAULT_SHORTCUT, 
+                        help=f'Keyboard shortcut for capturing screenshots (default: {DEFAULT_SHORTCUT})')
     parser.add_argument('--service', action='store_true',
                         help='Run as background service with menu bar icon')
+    parser.add_argument('--direct-capture', action='store_true',
+                        help='Launch directly into capture mode without showing main window')
+    parser.add_argument('--standby', action='store_true',
+                        help='With --direct-capture, wait for a line on stdin before capturing')
     args = parser.parse_args()
     
     # Start application
     if args.service:
-        import os
+        # Import the relevant modules
         import fcntl
         
         # Use a reliable file lock mechanism to prevent multiple instances
         try:
-            # Create a lock file in the user's home directory
-            lock_file_path = os.path.expanduser("~/.screenshot_util.lock")
-            lock_file = open(lock_file_path, 'w')
+            # The lock file is never deleted; the kernel releases the lock when
+            # this process exits, so there is no stale-lock or unlink race
+            os.makedirs(os.path.dirname(LOCK_FILE_PATH), exist_ok=True)
+            lock_fd = os.open(LOCK_FILE_PATH, os.O_RDWR | os.O_CREAT, 0o644)
             
             # Try to acquire an exclusive lock (non-blocking)
-            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            fcntl.lockf(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
             
             # Write our PID to the lock file
-            lock_file.write(str(os.getpid()))
-            lock_file.flush()
-            
-            # If we reach this point, we got the lock and can continue
-            # Keep the lock file open for the duration of the process
-            
-            # Set up a handler to release the lock on exit
-            import atexit
-            def cleanup_lock():
-                try:
-                    fcntl.flock(lock_file, fcntl.LOCK_UN)
-                    lock_file.close()
-                    os.remove(lock_file_path)
-                except:
-                    pass
-            atexit.register(cleanup_lock)
+            os.ftruncate(lock_fd, 0)
+            os.write(lock_fd, str(os.getpid()).encode())
             
             # If we got here, we have the lock and can start the service
             from src.service_app import run_service
@@ -61,8 +57,51 @@ def main():
         except Exception as e:
             print(f"Error setting up service: {e}")
             sys.exit(1)
+    elif args.direct_capture:
+        # Direct capture mode - just show the screen capture overlay without the main window
+        from PyQt6.QtWidgets import QApplication
+        from PyQt6.QtCore import QTimer
+        from src.screen_capture import ScreenCaptureOverlay
+        from src.screenshot_app import DirectCaptureHandler
+        
+        print("Starting direct capture mode...")
+        
+        app = QApplication(sys.argv)
+        
+        # Create handler and overlay
+        handler = DirectCaptureHandler()
+        capture = ScreenCaptureOverlay(handler)
+        
+        if args.standby:
+            # Started ahead of time by the menu bar service, which writes a
+            # line to stdin when the hotkey is pressed; EOF means it's gone.
+            # It lives as long as the service, so keep it out of the Dock and
+            # app switcher like the menu bar app itself; windows still show.
+            try:
+                from AppKit import NSApplication, NSApplicationActivationPolicyAccessory
+                NSApplication.sharedApplication().setActivationPolicy_(NSApplicationActivationPolicyAccessory)
+            except ImportError:
+                pass
+            from PyQt6.QtCore import QSocketNotifier
+            notifier = QSocketNotifier(sys.stdin.fileno(), QSocketNotifier.Type.Read)
+            
+            def on_capture_request():
+                notifier.setEnabled(False)
+                if sys.stdin.buffer.readline():
+                    capture.start_capture()
+                else:
+                    app.quit()
+            notifier.activated.connect(on_capture_request)
+        else:
+            # Wait a moment to make sure everything is initialized
+            QTimer.singleShot(300, capture.start_capture)
+        
+        # Run the application
+        sys.exit(app.exec())
     else:
         # Default UI mode
+        from PyQt6.QtWidgets import QApplication
+        from src.screenshot_app import ScreenshotApp
         app = QApplication(sys.argv)
         screenshot_app = ScreenshotApp(shortcut_key=args.shortcut)
         screenshot_app.show()
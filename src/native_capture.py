@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Native macOS screen capture
+
+Screens are grabbed in-process through Quartz (from pyobjc), straight into
+memory. The screencapture command is only used when Quartz can't be imported.
+"""
+import os
+import subprocess
+import tempfile
+from PIL import Image
+
+# Key in a captured PIL image's info dict holding its pixels per screen point.
+# A region can span screens of different resolutions, so the annotation
+# window reads this rather than asking any one screen.
+DEVICE_PIXEL_RATIO_KEY = "device_pixel_ratio"
+
+# Quartz is part of pyobjc; without it we fall back to the screencapture command
+try:
+    import Quartz
+except ImportError:
+    Quartz = None
+
+
+def make_temp_path(prefix, suffix):
+    """Create an empty temporary file with a unique name.
+
+    Args:
+        prefix: Start of the file name
+        suffix: End of the file name, including the extension
+
+    Returns:
+        str: Path of the new file
+    """
+    fd, path = tempfile.mkstemp(suffix=suffix, prefix=prefix)
+    os.close(fd)
+    return path
+
+
+def cgimage_to_pil(cg_image):
+    """Convert a Quartz CGImage to a PIL Image without an intermediate file.
+
+    Args:
+        cg_image: The CGImage to convert, in Quartz's native BGRA layout
+
+    Returns:
+        PIL.Image: An RGBA copy of the image
+    """
+    width = Quartz.CGImageGetWidth(cg_image)
+    height = Quartz.CGImageGetHeight(cg_image)
+    bytes_per_row = Quartz.CGImageGetBytesPerRow(cg_image)
+    data = Quartz.CGDataProviderCopyData(Quartz.CGImageGetDataProvider(cg_image))
+    return Image.frombuffer('RGBA', (width, height), bytes(data), 'raw', 'BGRA', bytes_per_row, 1)
+
+
+def _quartz_capture(rect):
+    """Grab the on-screen windows inside a Quartz rect as a PIL Image, or None"""
+    cg_image = Quartz.CGWindowListCreateImage(
+        rect,
+        Quartz.kCGWindowListOptionOnScreenOnly,
+        Quartz.kCGNullWindowID,
+        Quartz.kCGWindowImageDefault
+    )
+    if cg_image is None:
+        print("CGWindowListCreateImage returned no image")
+        return None
+    return cgimage_to_pil(cg_image)
+
+
+def _screencapture(args):
+    """Run screencapture with extra arguments and load the image it writes, or None"""
+    temp_file = make_temp_path("screencap_", ".bmp")
+    try:
+        result = subprocess.run(
+            ['screencapture', '-x', '-t', 'bmp', *args, temp_file],
+            capture_output=True, check=False
+        )
+        # The file starts out empty, so a size check catches a failed capture
+        if result.returncode != 0 or os.path.getsize(temp_file) == 0:
+            print(f"screencapture failed or produced an empty file: {result.stderr}")
+            return None
+        img = Image.open(temp_file)
+        img.load()  # Force load
+        return img
+    finally:
+        os.unlink(temp_file)  # Clean up
+
+
+def capture_full_screen():
+    """Capture every screen as one image covering their combined area.
+
+    Returns:
+        PIL.Image: The screenshot, or None if the capture failed
+    """
+    if Quartz is not None:
+        return _quartz_capture(Quartz.CGRectInfinite)
+    return _screencapture([])
+
+
+def capture_region(x, y, width, height):
+    """Capture a region of the screen.
+
+    Args:
+        x, y: Top-left corner of the region, in global screen points
+        width, height: Size of the region, in points
+
+    Returns:
+        PIL.Image: The region at the screen's native resolution, with its
+        pixels per point in info[DEVICE_PIXEL_RATIO_KEY], or None if the
+        capture failed
+    """
+    if Quartz is not None:
+        img = _quartz_capture(Quartz.CGRectMake(x, y, width, height))
+    else:
+        img = _screencapture(['-R', f"{x},{y},{width},{height}"])
+    if img is not None:
+        img.info[DEVICE_PIXEL_RATIO_KEY] = img.width / width
+    return img
@@ -3,8 +3,8 @@
 Hotkey Settings Dialog for Screenshot Utility
 """
 import sys
-import json
-import re
+import string
+import hashlib
 import os
 from PyQt6.QtWidgets import (
     QApplication, QDialog, QVBoxLayout, QHBoxLayout, QLabel,
@@ -12,6 +12,16 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt
 
+try:
+    from src.preferences_io import dumps_preferences, read_preferences, write_preferences
+except ImportError:
+    # The service runs this file as a script, which puts src/ itself on sys.path
+    from preferences_io import dumps_preferences, read_preferences, write_preferences
+
+# Keys that can be used for the hotkey: a single letter or digit, or f1-f12
+_SINGLE_KEYS = frozenset(string.ascii_lowercase + string.digits)
+_FUNCTION_KEYS = frozenset(f"f{i}" for i in range(1, 13))
+
 class HotkeyDialog(QDialog):
     """Dialog window for configuring screenshot hotkey settings.
     
@@ -28,13 +38,14 @@ class HotkeyDialog(QDialog):
         """
         super().__init__()
         self.config_path = config_path
+        
         self.setWindowTitle("Screenshot Hotkey Settings")
         self.setMinimumWidth(400)
         self.setMinimumHeight(200)
         
-        # Load settings
-        with open(config_path, 'r') as f:
-            self.preferences = json.load(f)
+        # Load settings, remembering a digest so an unchanged save can be skipped
+        self.preferences = read_preferences(config_path)
+        self._loaded_digest = self._preferences_digest()
         
         hotkey_config = self.preferences.get("hotkey", {"key": "4", "modifiers": ["command", "shift"]})
         
@@ -57,17 +68,19 @@ class HotkeyDialog(QDialog):
         self.ctrl_checkbox = QCheckBox("⌃ Control")
         self.option_checkbox = QCheckBox("⌥ Option")
         
-        # Set current values
-        modifiers = hotkey_config.get("modifiers", [])
-        self.cmd_checkbox.setChecked("command" in modifiers)
-        self.shift_checkbox.setChecked("shift" in modifiers)
-        self.ctrl_checkbox.setChecked("control" in modifiers)
-        self.option_checkbox.setChecked("option" in modifiers)
+        # Preference name of each modifier, in the order they are saved
+        self._modifier_boxes = [
+            ("command", self.cmd_checkbox),
+            ("shift", self.shift_checkbox),
+            ("control", self.ctrl_checkbox),
+            ("option", self.option_checkbox),
+        ]
         
-        modifiers_layout.addWidget(self.cmd_checkbox)
-        modifiers_layout.addWidget(self.shift_checkbox)
-        modifiers_layout.addWidget(self.ctrl_checkbox)
-        modifiers_layout.addWidget(self.option_checkbox)
+        # Set current values
+        modifiers = set(hotkey_config.get("modifiers", []))
+        for name, checkbox in self._modifier_boxes:
+            checkbox.setChecked(name in modifiers)
+            modifiers_layout.addWidget(checkbox)
         
         form_layout.addRow("Modifiers:", modifiers_layout)
         
@@ -120,21 +133,13 @@ class HotkeyDialog(QDialog):
         new_key = self.key_input.text().strip().lower()
         
         # Validate key is a single character or f1-f12
-        if not (re.match(r'^[a-z0-9]$', new_key) or re.match(r'^f[1-9]$|^f1[0-2]$', new_key)):
+        if not (new_key in _SINGLE_KEYS or new_key in _FUNCTION_KEYS):
             QMessageBox.critical(self, "Invalid Key", 
                                "Please enter a single letter, number, or function key (f1-f12)")
             return
         
         # Get modifiers
-        modifiers = []
-        if self.cmd_checkbox.isChecked():
-            modifiers.append("command")
-        if self.shift_checkbox.isChecked():
-            modifiers.append("shift")
-        if self.ctrl_checkbox.isChecked():
-            modifiers.append("control")
-        if self.option_checkbox.isChecked():
-            modifiers.append("option")
+        modifiers = [name for name, checkbox in self._modifier_boxes if checkbox.isChecked()]
         
         # Validate at least one modifier is selected
         if not modifiers:
@@ -148,11 +153,23 @@ class HotkeyDialog(QDialog):
             "modifiers": modifiers
         }
         
-        # Save preferences
-        with open(self.config_path, 'w') as f:
-            json.dump(self.preferences, f, indent=4)
+        # Nothing to write if the hotkey is what was loaded
+        if self._preferences_digest() == self._loaded_digest:
+            self.accept()
+            return
+        
+        try:
+            write_preferences(self.config_path, self.preferences)
+        except OSError as e:
+            print(f"Error saving preferences: {e}")
+            QMessageBox.critical(self, "Save Failed", f"Could not save preferences: {e}")
+            return
         
         self.accept()
+    
+    def _preferences_digest(self):
+        """Get a digest of the preferences as they would be written to disk"""
+        return hashlib.blake2b(dumps_preferences(self.preferences), digest_size=16).digest()
 
 def main():
     """Run the hotkey settings dialog"""
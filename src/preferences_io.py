@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Preferences file access shared by the menu bar service and the hotkey dialog
+"""
+import os
+import copy
+import json
+import threading
+from collections import defaultdict
+from functools import lru_cache
+
+# orjson is optional; it parses and serializes much faster than the json module
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Serializes writers of the same file; saves may run on worker threads
+_write_locks = defaultdict(threading.Lock)
+
+
+def _loads(data):
+    """Parse JSON bytes with orjson when available"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_preferences(preferences):
+    """Serialize preferences to indented JSON bytes, using orjson when available.
+
+    Args:
+        preferences: The preferences dictionary
+
+    Returns:
+        bytes: The encoded JSON document
+    """
+    if orjson is not None:
+        return orjson.dumps(preferences, option=orjson.OPT_INDENT_2)
+    # Same bytes as orjson, so switching backends doesn't defeat the unchanged-file check
+    return json.dumps(preferences, indent=2, ensure_ascii=False).encode()
+
+
+@lru_cache(maxsize=8)
+def _parse_preferences(path, mtime_ns, size):
+    """Parse a preferences file. Cached per file version, so callers must not mutate the result."""
+    with open(path, "rb") as f:
+        return _loads(f.read())
+
+
+def read_preferences(path):
+    """Read a preferences JSON file.
+
+    The parsed result is cached on the file's path, modification time and
+    size, so repeated reads of an unchanged file only cost a stat().
+
+    Args:
+        path: Path of the JSON preferences file
+
+    Returns:
+        dict: A private copy of the preferences that the caller may modify
+
+    Raises:
+        OSError: If the file can't be read
+        ValueError: If the file isn't valid JSON
+    """
+    stat = os.stat(path)
+    return copy.deepcopy(_parse_preferences(path, stat.st_mtime_ns, stat.st_size))
+
+
+def write_preferences(path, preferences):
+    """Write preferences to a JSON file, if they differ from what it already holds.
+
+    The new contents go to a temporary file that is then renamed over the
+    original, so a crash mid-write can't leave a truncated preferences file.
+
+    Args:
+        path: Path of the JSON preferences file
+        preferences: The preferences dictionary
+
+    Returns:
+        bool: True if the file was written, False if it was already up to date
+
+    Raises:
+        OSError: If the file can't be written
+    """
+    data = dumps_preferences(preferences)
+    with _write_locks[path]:
+        try:
+            with open(path, "rb") as f:
+                if f.read() == data:
+                    return False
+        except FileNotFoundError:
+            pass
+
+        tmp_path = path + ".tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.write(fd, data)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, path)
+        return True
@@ -4,18 +4,44 @@ Screen Capture Overlay Module for selecting screen regions
 """
 import sys
 import os
-import time
 import io
-import tempfile
+import traceback
+import time
 import pyautogui
-import subprocess
 from PIL import Image
+from src.native_capture import DEVICE_PIXEL_RATIO_KEY, capture_full_screen, capture_region, make_temp_path
 from PyQt6.QtWidgets import QWidget, QApplication
-from PyQt6.QtGui import QPainter, QPen, QColor, QGuiApplication, QScreen, QPixmap
-from PyQt6.QtCore import Qt, QPoint, QRect, QTimer, QSize, QBuffer, QByteArray
+from PyQt6.QtGui import QPainter, QPen, QColor, QGuiApplication, QScreen, QPixmap, QImage, QFont, QFontMetrics, QPolygon, QStaticText
+from PyQt6.QtCore import Qt, QPoint, QRect, QRectF, QTimer, QEventLoop, QSize, QBuffer, QByteArray
 from PyQt6.QtCore import Qt, QPoint, QRect
 import platform
 
+# Set SCREENCAP_DEBUG to keep a PNG copy of every capture in the temp directory
+_DEBUG = bool(os.environ.get('SCREENCAP_DEBUG'))
+
+# How long, in seconds, a full screenshot can be reused by a retried capture
+BACKDROP_CACHE_TTL = 0.25
+
+# Size of the squares drawn on the selection's corners, in pixels
+CORNER_SIZE = 6
+
+def qimage_to_pil(qimage):
+    """Convert a QImage to a PIL Image by copying its pixel buffer.
+    
+    Args:
+        qimage: The QImage to convert
+        
+    Returns:
+        PIL.Image: An RGBA copy of the image
+    """
+    if qimage.format() != QImage.Format.Format_RGBA8888:
+        qimage = qimage.convertToFormat(QImage.Format.Format_RGBA8888)
+    ptr = qimage.constBits()
+    ptr.setsize(qimage.sizeInBytes())
+    return Image.frombuffer('RGBA', (qimage.width(), qimage.height()), bytes(ptr),
+                            'raw', 'RGBA', qimage.bytesPerLine(), 1)
+
+
 class ScreenCaptureOverlay(QWidget):
     """Transparent overlay for selecting screen regions to capture"""
     
@@ -49,7 +75,47 @@ class ScreenCaptureOverlay(QWidget):
             
         self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
         
-        # Get information about all available screens
+        # Get information about all available screens, and keep it up to date
+        # when the setup changes rather than rescanning on every capture
+        self._recompute_geometry()
+        app = QGuiApplication.instance()
+        app.screenAdded.connect(self._on_screen_added)
+        app.screenRemoved.connect(self._recompute_geometry)
+        for screen in self.screens:
+            screen.geometryChanged.connect(self._recompute_geometry)
+        
+        # Store background screenshot for macOS workaround
+        self.background_image = None
+        
+        # Painting resources, built once rather than on every paint
+        self._overlay_color = QColor(0, 0, 0, 150)
+        self._label_color = QColor(0, 0, 0, 220)
+        self._text_color = QColor(255, 255, 255)
+        self._selection_color = QColor(0, 174, 255)
+        self._selection_pen = QPen(self._selection_color, 3)
+        self._corner_pen = QPen(self._selection_color, CORNER_SIZE, Qt.PenStyle.SolidLine, Qt.PenCapStyle.SquareCap)
+        self._backdrop_pixmap = None
+        self._backdrop_cache = {}  # screen layout -> (time taken, full screenshot)
+        self._last_selection_rect = QRect()
+        self._dirty_rect = QRect()  # Pending repaint area, flushed by _paint_timer
+        
+        # Mouse moves can arrive at up to 240 Hz, so the repaints they trigger
+        # are batched on a single-shot timer at roughly the display's refresh rate
+        self._paint_timer = QTimer(self)
+        self._paint_timer.setSingleShot(True)
+        self._paint_timer.setInterval(16)
+        self._paint_timer.timeout.connect(self._flush_update)
+        self._title_font = QFont(self.font())
+        self._title_font.setPointSize(16)
+        self._title_font.setBold(True)
+        self._dimension_font = QFont(self.font())
+        self._dimension_font.setPointSize(12)
+        self._dimension_font.setBold(True)
+        self._dimension_ascent = QFontMetrics(self._dimension_font).ascent()
+        self._dimension_label = QStaticText()
+    
+    def _recompute_geometry(self, *args):
+        """Rebuild the list of screens and their combined geometry"""
         self.screens = QGuiApplication.screens()
         self.screen_geometries = []
         self.total_geometry = QRect()
@@ -62,200 +128,146 @@ class ScreenCaptureOverlay(QWidget):
         
         self.screen_geometry = self.total_geometry
         print(f"Total detected screen geometry: {self.total_geometry.width()}x{self.total_geometry.height()}")
-        
-        # Store background screenshot for macOS workaround
-        self.background_image = None
+    
+    def _on_screen_added(self, screen):
+        """Track a newly connected screen"""
+        screen.geometryChanged.connect(self._recompute_geometry)
+        self._recompute_geometry()
     
     def start_capture(self):
         """Begin the screen capture process"""
-        # Take a full-screen screenshot BEFORE showing our overlay
-        # This is crucial so we can see the actual screen content
+        # On macOS the selected region is grabbed directly once the overlay is
+        # hidden, and a full screenshot is only taken if that fails, so
+        # there's no need for a full-screen grab up front
         self.background_image = None
-        try:
-            print("Taking full screenshot of all screens...")
-            # Try different methods to capture screenshot
-            if self.is_macos:
-                # First attempt: use macOS native screencapture
-                print("Attempting macOS native screenshot...")
-                self.background_image = self.take_full_screenshot()
-                
-                # If that fails, try PyQt
-                if not self.background_image:
-                    print("Native screenshot failed, trying PyQt method...")
-                    try:
-                        self.background_image = self.take_pyqt_screenshot()
-                        if self.background_image:
-                            print(f"PyQt screenshot captured: {self.background_image.width}x{self.background_image.height}")
-                    except Exception as e:
-                        print(f"PyQt screenshot method failed: {e}")
-                        
-                # If that also fails, try pyautogui
-                if not self.background_image:
-                    print("PyQt screenshot failed, trying pyautogui...")
-                    try:
-                        self.background_image = pyautogui.screenshot()
-                        if self.background_image:
-                            print(f"PyAutoGUI screenshot captured: {self.background_image.width}x{self.background_image.height}")
-                    except Exception as e:
-                        print(f"PyAutoGUI screenshot failed: {e}")
-            else:
-                # For other platforms try PyQt first, then pyautogui
-                try:
-                    self.background_image = self.take_pyqt_screenshot()
-                    if self.background_image:
-                        print(f"PyQt screenshot captured: {self.background_image.width}x{self.background_image.height}")
-                except Exception:
-                    print("PyQt screenshot failed, falling back to PyAutoGUI")
-                    
-                # Fallback to PyAutoGUI if PyQt fails
-                if not self.background_image:
-                    self.background_image = pyautogui.screenshot()
-                    if self.background_image:
-                        print(f"PyAutoGUI screenshot captured: {self.background_image.width}x{self.background_image.height}")
+        if not self.is_macos:
+            try:
+                self.background_image = self._capture_backdrop_for_overlay()
+            except Exception as e:
+                print(f"Error capturing background: {e}")
+                traceback.print_exc()
             
-            # Final check - if we still don't have a background image, abort
+            # If we don't have a background image, abort
             if not self.background_image:
                 print("All screenshot methods failed")
                 self.parent_app.show()
                 self.parent_app.on_capture_complete(None)
                 return
-                
-        except Exception as e:
-            print(f"Error capturing background: {e}")
-            import traceback
-            traceback.print_exc()
-            self.parent_app.show()
-            self.parent_app.on_capture_complete(None)
-            return
-        
-        # Update screen information in case setup changed
-        self.screens = QGuiApplication.screens()
-        self.screen_geometries = []
-        self.total_geometry = QRect()
-        
-        # Find combined geometry of all screens
-        for screen in self.screens:
-            geometry = screen.geometry()
-            self.screen_geometries.append(geometry)
-            self.total_geometry = self.total_geometry.united(geometry)
-        
-        self.screen_geometry = self.total_geometry
-        print(f"Updated screen geometry: {self.screen_geometry.width()}x{self.screen_geometry.height()}")
         
         # Reset selection points
         self.start_point = QPoint()
         self.end_point = QPoint()
         self.is_capturing = False
         
-        # Prepare window
-        if self.is_macos:
-            # For macOS, we need special handling
-            self.setWindowFlags(
-                Qt.WindowType.FramelessWindowHint | 
-                Qt.WindowType.WindowStaysOnTopHint |
-                Qt.WindowType.Tool
-            )
-        else:
-            self.setWindowFlags(
-                Qt.WindowType.FramelessWindowHint | 
-                Qt.WindowType.WindowStaysOnTopHint |
-                Qt.WindowType.BypassWindowManagerHint
-            )
-        
-        self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
+        # Prepare window. The window flags and translucency were set once in
+        # __init__; setting them again would make macOS rebuild the window.
         self.setGeometry(self.screen_geometry)
         self.setMouseTracking(True)
         
         # Show the overlay - but differently based on platform
         if self.is_macos:
             # On macOS, avoid showFullScreen as it can capture only itself
-            print("Using non-fullscreen mode for macOS")
             self.setWindowOpacity(0.5)  # More transparent on macOS
             self.show()
+        else:
+            # Use full screen for other platforms
+            self.showFullScreen()
+        
+        # Process events to ensure window is shown properly
+        QApplication.processEvents()
+    
+    def showEvent(self, event):
+        """Bring the overlay to the front and activate it as soon as it is shown"""
+        super().showEvent(event)
+        if self.is_macos:
             # Special flag for macOS to keep window on top of all screens
             try:
                 self.windowHandle().setLevel(5)  # Qt.WindowStaysOnTopHint level
             except Exception as e:
                 print(f"Failed to set window level: {e}")
-        else:
-            # Use full screen for other platforms
-            print("Using fullscreen mode for non-macOS")
-            self.showFullScreen()
-        
-        # Make sure window is visible and active
         self.raise_()
-        self.activateWindow() 
+        self.activateWindow()
         self.setCursor(Qt.CursorShape.CrossCursor)
+    
+    def _capture_backdrop_for_overlay(self):
+        """Take a full screenshot of all screens, reusing a very recent one.
         
-        # Process events to ensure window is shown properly
-        QApplication.processEvents()
+        A capture retried straight after the previous one reuses its
+        screenshot, as long as the screen layout hasn't changed.
         
-        # Force the window to be active and on top
-        QTimer.singleShot(100, lambda: self.activateWindow())
-        QTimer.singleShot(100, lambda: self.raise_())
+        Returns:
+            PIL.Image: The full-screen image, or None if every method failed
+        """
+        key = tuple((g.x(), g.y(), g.width(), g.height()) for g in self.screen_geometries)
+        now = time.monotonic()
+        
+        # Drop expired screenshots so the cache doesn't hold on to them
+        self._backdrop_cache = {
+            k: entry for k, entry in self._backdrop_cache.items()
+            if now - entry[0] < BACKDROP_CACHE_TTL
+        }
+        if key in self._backdrop_cache:
+            return self._backdrop_cache[key][1]
+        
+        background_image = self._take_backdrop_screenshot()
+        if background_image:
+            self._backdrop_cache[key] = (now, background_image)
+        return background_image
     
-    def take_full_screenshot(self):
-        """Take a full screenshot of all screens using macOS native command"""
-        try:
-            # Create a temporary file
-            temp_file = f"/tmp/screenshot_temp_{int(time.time())}.png"
-            print(f"Taking full screenshot to temp file: {temp_file}")
-            
-            # Use macOS native screencapture command
-            # Use -x flag to disable sound
-            # Use -C flag to capture cursor
-            command = ['screencapture', '-x', temp_file]
-            print(f"Running command: {' '.join(command)}")
-            
-            result = subprocess.run(command, capture_output=True, text=True, check=False)
-            
-            if result.returncode != 0:
-                print(f"screencapture failed with return code {result.returncode}")
-                print(f"stderr: {result.stderr}")
-                print(f"stdout: {result.stdout}")
-                return None
-                
-            # Check if file exists
-            if not os.path.exists(temp_file):
-                print(f"Screenshot file not created: {temp_file}")
-                return None
-                
-            # Get file size
-            file_size = os.path.getsize(temp_file)
-            print(f"Screenshot file created: {temp_file}, size: {file_size} bytes")
-            
-            if file_size == 0:
-                print("Screenshot file is empty")
-                return None
-                
-            # Open the image file
-            try:
-                img = Image.open(temp_file)
-                img.load()  # Make sure the image data is loaded
-                print(f"Screenshot loaded as PIL Image: {img.width}x{img.height}, mode: {img.mode}")
-                
-                # Keep a copy for debugging
-                debug_file = f"/tmp/screenshot_debug_{int(time.time())}.png"
-                img.save(debug_file)
-                print(f"Debug copy saved to: {debug_file}")
-                
-            except Exception as e:
-                print(f"Error loading screenshot file: {e}")
-                import traceback
-                traceback.print_exc()
-                return None
+    def _take_backdrop_screenshot(self):
+        """Take a full screenshot of all screens, trying each available method.
+        
+        Returns:
+            PIL.Image: The full-screen image, or None if every method failed
+        """
+        print("Taking full screenshot of all screens...")
+        background_image = None
+        if self.is_macos:
+            # First attempt: use the native macOS capture
+            print("Attempting macOS native screenshot...")
+            background_image = self.take_full_screenshot()
             
-            # Clean up the temp file
+            # If that fails, try PyQt
+            if not background_image:
+                print("Native screenshot failed, trying PyQt method...")
+                try:
+                    background_image = self.take_pyqt_screenshot()
+                    if background_image:
+                        print(f"PyQt screenshot captured: {background_image.width}x{background_image.height}")
+                except Exception as e:
+                    print(f"PyQt screenshot method failed: {e}")
+                    
+            # If that also fails, try pyautogui
+            if not background_image:
+                print("PyQt screenshot failed, trying pyautogui...")
+                try:
+                    background_image = pyautogui.screenshot()
+                    if background_image:
+                        print(f"PyAutoGUI screenshot captured: {background_image.width}x{background_image.height}")
+                except Exception as e:
+                    print(f"PyAutoGUI screenshot failed: {e}")
+        else:
+            # For other platforms try PyQt first, then pyautogui
             try:
-                os.remove(temp_file)
-                print(f"Temporary file {temp_file} removed")
-            except Exception as e:
-                print(f"Failed to remove temp file: {e}")
+                background_image = self.take_pyqt_screenshot()
+                if background_image:
+                    print(f"PyQt screenshot captured: {background_image.width}x{background_image.height}")
+            except Exception:
+                print("PyQt screenshot failed, falling back to PyAutoGUI")
                 
-            return img
+            # Fallback to PyAutoGUI if PyQt fails
+            if not background_image:
+                background_image = pyautogui.screenshot()
+                if background_image:
+                    print(f"PyAutoGUI screenshot captured: {background_image.width}x{background_image.height}")
+        return background_image
+    
+    def take_full_screenshot(self):
+        """Take a full screenshot of all screens with the native macOS capture"""
+        try:
+            return capture_full_screen()
         except Exception as e:
             print(f"Error taking full screenshot: {e}")
-            import traceback
             traceback.print_exc()
             return None
     
@@ -263,19 +275,17 @@ class ScreenCaptureOverlay(QWidget):
         """Handle paint events to draw selection rectangle"""
         painter = QPainter(self)
         
-        # Draw darker semi-transparent overlay (increased opacity to 150)
-        painter.fillRect(self.rect(), QColor(0, 0, 0, 150))
+        # Rebuild the cached backdrop if the status text or window size changed
+        if (self._backdrop_pixmap is None or
+                self._backdrop_pixmap.deviceIndependentSize().toSize() != self.size()):
+            self._build_backdrop()
         
-        # Draw instruction text at the top
-        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_SourceOver)
-        font = painter.font()
-        font.setPointSize(16)  # Larger text
-        font.setBold(True)  # Make text bold
-        painter.setFont(font)
-        painter.setPen(QColor(255, 255, 255))
-        text_rect = self.rect()
-        text_rect.setHeight(70)  # Larger text area
-        painter.drawText(text_rect, Qt.AlignmentFlag.AlignCenter, self.status_text)
+        # Copy the darkened backdrop and instruction text for the area being
+        # repainted. The source rect is in the pixmap's physical pixels.
+        rect = event.rect()
+        ratio = self._backdrop_pixmap.devicePixelRatio()
+        source = QRectF(rect.x() * ratio, rect.y() * ratio, rect.width() * ratio, rect.height() * ratio)
+        painter.drawPixmap(QRectF(rect), self._backdrop_pixmap, source)
         
         # Draw selection rectangle if we're capturing
         if self.is_capturing and not self.start_point.isNull() and not self.end_point.isNull():
@@ -285,53 +295,60 @@ class ScreenCaptureOverlay(QWidget):
             painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Clear)
             painter.fillRect(selection_rect, Qt.GlobalColor.white)
             
-            # Draw selection rectangle border with a more visible blue color
+            # Draw selection rectangle border
             painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_SourceOver)
-            pen = QPen(QColor(0, 174, 255), 3)  # Thicker border
-            painter.setPen(pen)
+            painter.setPen(self._selection_pen)
             painter.drawRect(selection_rect)
             
-            # Draw corner markers to make them more visible
-            corner_size = 6
-            corner_color = QColor(0, 174, 255)
-            
-            # Draw corner squares at each corner - using integers to avoid type errors
-            painter.fillRect(QRect(int(selection_rect.topLeft().x() - corner_size/2), 
-                                  int(selection_rect.topLeft().y() - corner_size/2), 
-                                  corner_size, corner_size), corner_color)
+            # Draw corner squares to make the corners more visible. A square
+            # capped pen draws each point as a CORNER_SIZE square around it.
+            painter.setPen(self._corner_pen)
+            painter.drawPoints(QPolygon([
+                selection_rect.topLeft(), selection_rect.topRight(),
+                selection_rect.bottomLeft(), selection_rect.bottomRight()
+            ]))
             
-            painter.fillRect(QRect(int(selection_rect.topRight().x() - corner_size/2), 
-                                  int(selection_rect.topRight().y() - corner_size/2), 
-                                  corner_size, corner_size), corner_color)
-            
-            painter.fillRect(QRect(int(selection_rect.bottomLeft().x() - corner_size/2), 
-                                  int(selection_rect.bottomLeft().y() - corner_size/2), 
-                                  corner_size, corner_size), corner_color)
-            
-            painter.fillRect(QRect(int(selection_rect.bottomRight().x() - corner_size/2), 
-                                  int(selection_rect.bottomRight().y() - corner_size/2), 
-                                  corner_size, corner_size), corner_color)
-            
-            # Draw dimensions of selection
-            width = selection_rect.width()
-            height = selection_rect.height()
-            dimension_text = f"{width} × {height}"
+            # Draw dimensions of selection, laying the text out again only
+            # when the size changes
+            dimension_text = f"{selection_rect.width()} × {selection_rect.height()}"
+            if self._dimension_label.text() != dimension_text:
+                self._dimension_label.setText(dimension_text)
             
             # Position the text at the bottom right of the selection
             text_x = selection_rect.right() - 90
             text_y = selection_rect.bottom() + 25
             
             # Create a background for the text
-            text_rect = QRect(text_x - 5, text_y - 20, 100, 30)
-            painter.fillRect(text_rect, QColor(0, 0, 0, 220))
+            painter.fillRect(QRect(text_x - 5, text_y - 20, 100, 30), self._label_color)
             
             # Draw the text
-            painter.setPen(QColor(255, 255, 255))
-            font = painter.font()
-            font.setPointSize(12)
-            font.setBold(True)
-            painter.setFont(font)
-            painter.drawText(text_x, text_y, dimension_text)
+            painter.setPen(self._text_color)
+            painter.setFont(self._dimension_font)
+            painter.drawStaticText(text_x, text_y - self._dimension_ascent, self._dimension_label)
+    
+    def _build_backdrop(self):
+        """Render the darkened overlay and instruction text into a cached pixmap"""
+        ratio = self.devicePixelRatioF()
+        self._backdrop_pixmap = QPixmap(self.size() * ratio)
+        self._backdrop_pixmap.setDevicePixelRatio(ratio)
+        self._backdrop_pixmap.fill(Qt.GlobalColor.transparent)
+        
+        painter = QPainter(self._backdrop_pixmap)
+        painter.fillRect(self.rect(), self._overlay_color)
+        
+        # Draw instruction text at the top
+        painter.setFont(self._title_font)
+        painter.setPen(self._text_color)
+        text_rect = self.rect()
+        text_rect.setHeight(70)  # Larger text area
+        painter.drawText(text_rect, Qt.AlignmentFlag.AlignCenter, self.status_text)
+        painter.end()
+    
+    def set_status_text(self, text):
+        """Change the instruction text and repaint the overlay"""
+        self.status_text = text
+        self._backdrop_pixmap = None
+        self.update()
     
     def mousePressEvent(self, event):
         """Handle mouse press events to start selection"""
@@ -339,14 +356,39 @@ class ScreenCaptureOverlay(QWidget):
             self.start_point = event.pos()
             self.end_point = event.pos()
             self.is_capturing = True
-            self.status_text = "Release mouse to capture"
-            self.update()
+            self._last_selection_rect = self._selection_bounds()
+            self.set_status_text("Release mouse to capture")
     
     def mouseMoveEvent(self, event):
         """Handle mouse move events to update selection"""
         if self.is_capturing:
             self.end_point = event.pos()
-            self.update()
+            # Only repaint where the old and new selection were drawn
+            selection_rect = self._selection_bounds()
+            self._schedule_update(self._last_selection_rect.united(selection_rect))
+            self._last_selection_rect = selection_rect
+    
+    def _schedule_update(self, rect):
+        """Queue a repaint of rect, merging all requests made while the paint timer runs.
+        
+        Args:
+            rect: The QRect that needs repainting
+        """
+        if not self._paint_timer.isActive():
+            self._paint_timer.start()
+        self._dirty_rect = self._dirty_rect.united(rect)
+    
+    def _flush_update(self):
+        """Repaint the area collected by _schedule_update"""
+        rect = self._dirty_rect
+        self._dirty_rect = QRect()
+        self.update(rect)
+    
+    def _selection_bounds(self):
+        """Get the area covered by the selection, its corner markers and its size label"""
+        rect = QRect(self.start_point, self.end_point).normalized()
+        label_rect = QRect(rect.right() - 95, rect.bottom() + 5, 100, 30)
+        return rect.adjusted(-CORNER_SIZE, -CORNER_SIZE, CORNER_SIZE, CORNER_SIZE).united(label_rect)
     
     def mouseReleaseEvent(self, event):
         """Handle mouse release events to complete selection"""
@@ -367,7 +409,7 @@ class ScreenCaptureOverlay(QWidget):
             self.parent_app.on_capture_complete(None)
     
     def take_screenshot(self):
-        """Capture the selected region of the screen using the pre-captured background image"""
+        """Capture the selected region of the screen, falling back to cropping a full screenshot"""
         # Get the normalized rectangle coordinates in widget space
         rect = QRect(self.start_point, self.end_point).normalized()
         
@@ -377,219 +419,150 @@ class ScreenCaptureOverlay(QWidget):
             self.parent_app.on_capture_complete(None)
             return
         
-        # Update status to provide feedback
-        self.status_text = "Processing screenshot..."
-        self.update()
-        QApplication.processEvents()  # Make sure update is visible
-        
-        # We need to hide the overlay
+        # We need to hide the overlay before capturing. There's no point
+        # showing a status message on it first, as it disappears right away.
         self.hide()
-        QApplication.processEvents()  # Ensure window is hidden
+        QApplication.processEvents(QEventLoop.ProcessEventsFlag.ExcludeUserInputEvents)  # Ensure window is hidden
+        
+        # Convert widget coordinates to screen coordinates (in points). The
+        # overlay is a frameless top-level window, so this is just an offset.
+        global_rect = rect.translated(self.pos())
+        global_x = global_rect.x()
+        global_y = global_rect.y()
+        global_width = global_rect.width()
+        global_height = global_rect.height()
         
-        # Use special shortcut method for macOS
+        # On macOS grab just the selected region now that the overlay is hidden
         if self.is_macos:
-            # Try to take a new screenshot of the specific region directly
-            # This can work better than cropping from a full screenshot
-            print("Attempting direct region capture with macOS native method")
             try:
-                # Convert widget coordinates to screen coordinates
-                start_global = self.mapToGlobal(rect.topLeft())
-                end_global = self.mapToGlobal(rect.bottomRight())
-                
-                global_rect = QRect(start_global, end_global).normalized()
-                global_x = global_rect.x()
-                global_y = global_rect.y()
-                global_width = global_rect.width()
-                global_height = global_rect.height()
-                
-                # Ensure coordinates are positive
-                if global_width > 10 and global_height > 10:
-                    # Use screencapture directly
-                    temp_file = f"/tmp/direct_region_{int(time.time())}.png"
-                    print(f"Running screencapture for region {global_x},{global_y},{global_width},{global_height}")
-                    result = subprocess.run(
-                        ['screencapture', '-x', '-R', f"{global_x},{global_y},{global_width},{global_height}", temp_file],
-                        capture_output=True, check=False
-                    )
-                    
-                    if result.returncode == 0 and os.path.exists(temp_file) and os.path.getsize(temp_file) > 0:
-                        try:
-                            # Load the image
-                            direct_img = Image.open(temp_file)
-                            direct_img.load()  # Force load
-                            os.unlink(temp_file)  # Clean up
-                            
-                            print(f"Direct region capture successful: {direct_img.width}x{direct_img.height}")
-                            # Save a debug copy
-                            debug_file = f"/tmp/direct_region_capture_{int(time.time())}.png"
-                            direct_img.save(debug_file)
-                            
-                            # Send to parent
-                            self.parent_app.on_capture_complete(direct_img)
-                            return
-                        except Exception as e:
-                            print(f"Error loading direct region capture: {e}")
-                    else:
-                        print("Direct region capture failed or produced empty file")
+                direct_img = capture_region(global_x, global_y, global_width, global_height)
+                if direct_img is not None:
+                    self.parent_app.on_capture_complete(direct_img)
+                    return
             except Exception as e:
                 print(f"Error with direct region capture: {e}")
-                import traceback
                 traceback.print_exc()
+            
+            # Region capture failed, so crop from a full screenshot instead
+            if not self.background_image:
+                self.background_image = self._capture_backdrop_for_overlay()
                 
-        # Fallback: Use the background image we already captured
+        # Fallback: crop from the full background image
         if self.background_image:
             try:
-                # Convert widget coordinates to screen coordinates
-                start_global = self.mapToGlobal(rect.topLeft())
-                end_global = self.mapToGlobal(rect.bottomRight())
-                
-                global_rect = QRect(start_global, end_global).normalized()
-                global_x = global_rect.x()
-                global_y = global_rect.y()
-                global_width = global_rect.width()
-                global_height = global_rect.height()
-                
-                print(f"Raw global coordinates: x={global_x}, y={global_y}, width={global_width}, height={global_height}")
-                
-                # Handle negative coordinates (can happen with multiple monitors)
-                if global_x < 0 or global_y < 0:
-                    print("Detected negative coordinates, adjusting...")
-                    # Adjust the coordinates if they are negative
-                    if global_x < 0:
-                        global_width += global_x  # Reduce width by the negative amount
-                        global_x = 0
-                    if global_y < 0:
-                        global_height += global_y  # Reduce height by the negative amount
-                        global_y = 0
-                
-                print(f"Adjusted coordinates for cropping: x={global_x}, y={global_y}, width={global_width}, height={global_height}")
-                
-                # Make sure we have positive width and height
-                if global_width <= 0 or global_height <= 0:
-                    print("Invalid dimensions after adjustment")
+                cropped = self._crop_background(global_x, global_y, global_width, global_height)
+                if cropped is None:
+                    print("Invalid crop dimensions")
                     self.parent_app.on_capture_complete(None)
                     return
-            except Exception as e:
-                print(f"Error processing coordinates: {e}")
-                import traceback
-                traceback.print_exc()
-                self.parent_app.on_capture_complete(None)
-                return
-            
-            try:
-                # Create a cropped version from our background image
-                # Ensure coordinates are within image bounds
-                img_width, img_height = self.background_image.size
                 
-                # Clamp coordinates to image bounds
-                x1 = max(0, min(global_x, img_width - 1))
-                y1 = max(0, min(global_y, img_height - 1))
-                x2 = max(0, min(global_x + global_width, img_width))
-                y2 = max(0, min(global_y + global_height, img_height))
+                # Check if we need to convert the image format
+                if cropped.mode not in ['RGB', 'RGBA']:
+                    print(f"Converting image from {cropped.mode} to RGBA")
+                    cropped = cropped.convert('RGBA')
                 
-                print(f"Cropping bounds: ({x1}, {y1}, {x2}, {y2}) from image size: {img_width}x{img_height}")
                 
-                if x2 <= x1 or y2 <= y1:
-                    print("Invalid crop dimensions")
-                    self.parent_app.on_capture_complete(None)
-                    return
-                
-                try:
-                    # Crop from the background image
-                    cropped = self.background_image.crop((x1, y1, x2, y2))
-                    
-                    # Check if we need to convert the image format
-                    if cropped.mode not in ['RGB', 'RGBA']:
-                        print(f"Converting image from {cropped.mode} to RGBA")
-                        cropped = cropped.convert('RGBA')
-                    
-                    print(f"Crop successful: {cropped.width}x{cropped.height}, mode: {cropped.mode}")
-                    
-                    # Send the cropped image to the parent
-                    self.parent_app.on_capture_complete(cropped)
-                except Exception as e:
-                    import traceback
-                    print(f"Error cropping image: {e}")
-                    traceback.print_exc()
-                    self.parent_app.on_capture_complete(None)
+                # Send the cropped image to the parent
+                self.parent_app.on_capture_complete(cropped)
                 return
             except Exception as e:
                 print(f"Error cropping background image: {e}")
+                traceback.print_exc()
         
         # If we reach here, something went wrong with the background image approach
         # Fall back to taking a fresh screenshot
         print("Fallback to direct screenshot capture...")
         self._take_direct_screenshot(global_x, global_y, global_width, global_height)
     
+    def _crop_background(self, x, y, width, height):
+        """Crop a region given in global screen points out of the background image.
+        
+        The background image covers the combined geometry of all screens, but
+        may have more pixels than points (e.g. a Retina capture), so the region
+        is offset to the image's origin and scaled to its resolution.
+        
+        Returns:
+            PIL.Image: The cropped region, with its pixels per point in
+            info[DEVICE_PIXEL_RATIO_KEY], or None if it lies outside the image
+        """
+        img_width, img_height = self.background_image.size
+        scale = img_width / self.total_geometry.width()
+        left = (x - self.total_geometry.x()) * scale
+        top = (y - self.total_geometry.y()) * scale
+        
+        # Clamp coordinates to image bounds
+        x1 = max(0, min(round(left), img_width))
+        y1 = max(0, min(round(top), img_height))
+        x2 = max(0, min(round(left + width * scale), img_width))
+        y2 = max(0, min(round(top + height * scale), img_height))
+        
+        if x2 <= x1 or y2 <= y1:
+            return None
+        cropped = self.background_image.crop((x1, y1, x2, y2))
+        cropped.info[DEVICE_PIXEL_RATIO_KEY] = scale
+        return cropped
+    
     def take_pyqt_screenshot(self):
         """Take a full screenshot using PyQt's native screen capture abilities.
         
         This method attempts to capture all screens using PyQt's screen capture
-        capabilities and combines them into a single PIL Image. If capturing
-        multiple screens fails, it falls back to capturing just the primary screen.
+        capabilities, draws them onto a single QImage and converts that to a
+        PIL Image. If capturing multiple screens fails, it falls back to
+        capturing just the primary screen.
         
         Returns:
             PIL.Image: The combined screenshot image of all screens, or None if capture fails
         """
         try:
-            print("Starting PyQt screenshot capture")
-            # We'll capture each screen separately and then combine them
-            combined_image = None
+            # We'll capture each screen separately and draw them onto one image
+            combined = None
+            painter = None
             
             # Get all screens
             screens = QGuiApplication.screens()
-            print(f"Found {len(screens)} screens")
             
-            for i, screen in enumerate(screens):
-                try:
-                    print(f"Capturing screen {i+1}/{len(screens)}")
-                    # Get screen geometry and logical DPI
-                    geometry = screen.geometry()
-                    dpi = screen.logicalDotsPerInch()
-                    print(f"Screen {i+1} geometry: {geometry.x()},{geometry.y()} {geometry.width()}x{geometry.height()}, DPI: {dpi}")
-                    
-                    # Capture the screen - 0 = entire desktop
-                    pixmap = screen.grabWindow(0)
-                    
-                    if pixmap.isNull():
-                        print(f"Screen {i+1} capture returned null pixmap")
-                        continue
+            try:
+                for i, screen in enumerate(screens):
+                    try:
+                        geometry = screen.geometry()
                         
-                    print(f"Screen {i+1} capture successful: {pixmap.width()}x{pixmap.height()}")
-                    
-                    # Save the pixmap to a temporary file
-                    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.png')
-                    temp_file.close()
-                    pixmap.save(temp_file.name, 'PNG')
-                    
-                    # Open with PIL
-                    screen_img = Image.open(temp_file.name)
-                    os.unlink(temp_file.name)
-                    
-                    print(f"Converted to PIL Image: {screen_img.width}x{screen_img.height}")
-                    
-                    # If this is our first screen, just use it as the base
-                    if combined_image is None:
-                        combined_image = Image.new('RGB', (self.total_geometry.width(), self.total_geometry.height()), (0, 0, 0))
-                        print(f"Created combined image: {combined_image.width}x{combined_image.height}")
-                    
-                    # Paste this screen at the correct position in the combined image
-                    # Convert from screen coordinates to combined image coordinates
-                    x = geometry.x() - self.total_geometry.x()
-                    y = geometry.y() - self.total_geometry.y()
-                    print(f"Pasting screen {i+1} at position {x},{y}")
-                    combined_image.paste(screen_img, (x, y))
-                    
-                except Exception as e:
-                    print(f"Error capturing screen {i+1}: {e}")
-                    import traceback
-                    traceback.print_exc()
+                        # Capture the screen - 0 = entire desktop
+                        pixmap = screen.grabWindow(0)
+                        
+                        if pixmap.isNull():
+                            print(f"Screen {i+1} capture returned null pixmap")
+                            continue
+                        
+                        # If this is our first screen, create the combined image. It
+                        # uses the byte order PIL's RGBA mode expects, so that
+                        # qimage_to_pil doesn't need to convert it.
+                        if combined is None:
+                            combined = QImage(self.total_geometry.size(), QImage.Format.Format_RGBA8888)
+                            combined.fill(Qt.GlobalColor.black)
+                            painter = QPainter(combined)
+                        
+                        # Draw this screen at the correct position in the combined image
+                        # Convert from screen coordinates to combined image coordinates
+                        x = geometry.x() - self.total_geometry.x()
+                        y = geometry.y() - self.total_geometry.y()
+                        painter.drawPixmap(x, y, pixmap)
+                        
+                    except Exception as e:
+                        print(f"Error capturing screen {i+1}: {e}")
+                        traceback.print_exc()
+            finally:
+                if painter is not None:
+                    painter.end()
+            
+            # Convert the finished composite to PIL once
+            combined_image = qimage_to_pil(combined) if combined is not None else None
             
             if combined_image:
                 # Save a debug copy of the combined image
-                debug_file = f"/tmp/combined_screenshot_{int(time.time())}.png"
-                combined_image.save(debug_file)
-                print(f"Saved combined screenshot to {debug_file}")
+                if _DEBUG:
+                    debug_file = make_temp_path("combined_screenshot_", ".png")
+                    combined_image.save(debug_file)
+                    print(f"Saved combined screenshot to {debug_file}")
                 return combined_image
             
             # If we couldn't create a combined image but have at least one screen, try a different approach
@@ -606,26 +579,19 @@ class ScreenCaptureOverlay(QWidget):
                 print("Primary screen capture returned null pixmap")
                 return None
                 
-            # Save to temporary file to avoid conversion issues
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.png')
-            temp_file.close()
-            pixmap.save(temp_file.name, 'PNG')
-            
-            # Load with PIL
-            img = Image.open(temp_file.name)
-            os.unlink(temp_file.name)
+            # Convert to PIL in memory
+            img = qimage_to_pil(pixmap.toImage())
             
-            print(f"Alternative PyQt screenshot successful: {img.width}x{img.height}")
             
             # Save a debug copy
-            debug_file = f"/tmp/alternative_screenshot_{int(time.time())}.png"
-            img.save(debug_file)
-            print(f"Saved alternative screenshot to {debug_file}")
+            if _DEBUG:
+                debug_file = make_temp_path("alternative_screenshot_", ".png")
+                img.save(debug_file)
+                print(f"Saved alternative screenshot to {debug_file}")
             
             return img
         except Exception as e:
             print(f"PyQt screenshot failed: {e}")
-            import traceback
             traceback.print_exc()
             return None
     
@@ -633,8 +599,8 @@ class ScreenCaptureOverlay(QWidget):
         """Take a direct screenshot of a specific region as a fallback method.
         
         Attempts multiple screenshot methods in order of preference:
-        1. macOS native screencapture command (if on macOS)
-        2. PyAutoGUI screenshot
+        1. Native macOS capture (if on macOS)
+        2. PyAutoGUI screenshot (if not on macOS)
         3. Crop from existing background image
         4. PyQt screenshot
         
@@ -654,63 +620,33 @@ class ScreenCaptureOverlay(QWidget):
         screenshot = None
         
         try:
-            # Method 1: For macOS, try using the native screencapture command
+            # Method 1: For macOS, try the native capture
             if self.is_macos:
-                print("Trying macOS native screencapture for region...")
-                temp_file = f"/tmp/screenshot_region_{int(time.time())}.png"
-                command = ['screencapture', '-x', '-R', f"{x},{y},{width},{height}", temp_file]
-                print(f"Running command: {' '.join(command)}")
-                
-                result = subprocess.run(command, capture_output=True, text=True, check=False)
-                
-                if result.returncode == 0 and os.path.exists(temp_file):
-                    file_size = os.path.getsize(temp_file)
-                    print(f"Region screenshot file created: {temp_file}, size: {file_size} bytes")
-                    
-                    if file_size > 0:
-                        try:
-                            img = Image.open(temp_file)
-                            img.load()  # Make sure the image data is loaded
-                            print(f"Region screenshot loaded: {img.width}x{img.height}, mode: {img.mode}")
-                            screenshot = img
-                        except Exception as e:
-                            print(f"Error loading region screenshot: {e}")
-                    
-                    # Clean up
-                    try:
-                        os.remove(temp_file)
-                    except Exception as e:
-                        print(f"Failed to remove temp file: {e}")
-                else:
-                    print(f"screencapture region command failed: {result.stderr}")
+                print("Trying macOS native capture for region...")
+                screenshot = capture_region(x, y, width, height)
         except Exception as e:
-            print(f"macOS screencapture method failed: {e}")
-            import traceback
+            print(f"macOS native capture method failed: {e}")
             traceback.print_exc()
                     
-        # Method 2: Try PyAutoGUI if screencapture failed
-        if screenshot is None:
+        # Method 2: Try PyAutoGUI if the native capture failed. On macOS it
+        # would use the same native capture again, so it's skipped there.
+        if screenshot is None and not self.is_macos:
             try:
                 print("Trying PyAutoGUI for region screenshot...")
                 screenshot = pyautogui.screenshot(region=(x, y, width, height))
                 if screenshot:
+                    screenshot.info[DEVICE_PIXEL_RATIO_KEY] = screenshot.width / width
                     print(f"PyAutoGUI region screenshot captured: {screenshot.width}x{screenshot.height}")
             except Exception as e:
                 print(f"PyAutoGUI region screenshot failed: {e}")
-                import traceback
                 traceback.print_exc()
         
         # Method 3: Try cropping from the full screenshot we already have
         if screenshot is None and self.background_image:
             try:
                 print("Trying to crop from existing background image...")
-                x1 = max(0, min(x, self.background_image.width - 1))
-                y1 = max(0, min(y, self.background_image.height - 1))
-                x2 = max(0, min(x + width, self.background_image.width))
-                y2 = max(0, min(y + height, self.background_image.height))
-                
-                if x2 > x1 and y2 > y1:
-                    screenshot = self.background_image.crop((x1, y1, x2, y2))
+                screenshot = self._crop_background(x, y, width, height)
+                if screenshot is not None:
                     print(f"Cropped from background: {screenshot.width}x{screenshot.height}")
             except Exception as e:
                 print(f"Crop from background failed: {e}")
@@ -743,28 +679,27 @@ class ScreenCaptureOverlay(QWidget):
                             # Crop to our region
                             cropped_pixmap = pixmap.copy(rel_x, rel_y, rel_width, rel_height)
                             if not cropped_pixmap.isNull():
-                                # Convert to PIL Image
-                                temp_path = tempfile.mktemp(suffix='.png')
-                                cropped_pixmap.save(temp_path, 'PNG')
-                                screenshot = Image.open(temp_path)
-                                os.unlink(temp_path)
-                                print(f"PyQt screenshot successful: {screenshot.width}x{screenshot.height}")
+                                # The annotation window takes QPixmaps directly,
+                                # so skip the round trip through a PNG and PIL
+                                screenshot = cropped_pixmap
+                                print(f"PyQt screenshot successful: {screenshot.width()}x{screenshot.height()}")
                                 break
             except Exception as e:
                 print(f"PyQt screenshot method failed: {e}")
-                import traceback
                 traceback.print_exc()
                 
         # Send the result (or None if all methods failed)
-        if screenshot and hasattr(screenshot, 'width') and hasattr(screenshot, 'height'):
-            if screenshot.width > 0 and screenshot.height > 0:
+        if screenshot is not None:
+            width, height = screenshot.size if isinstance(screenshot, Image.Image) else (screenshot.width(), screenshot.height())
+            if width > 0 and height > 0:
                 # Save a debug copy
-                try:
-                    debug_file = f"/tmp/screenshot_region_debug_{int(time.time())}.png"
-                    screenshot.save(debug_file)
-                    print(f"Debug region saved to: {debug_file}")
-                except Exception as e:
-                    print(f"Failed to save debug region: {e}")
+                if _DEBUG:
+                    try:
+                        debug_file = make_temp_path("screenshot_region_debug_", ".png")
+                        screenshot.save(debug_file)
+                        print(f"Debug region saved to: {debug_file}")
+                    except Exception as e:
+                        print(f"Failed to save debug region: {e}")
                 
                 self.parent_app.on_capture_complete(screenshot)
                 return
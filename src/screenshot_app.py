@@ -8,6 +8,7 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtGui import QKeySequence, QShortcut
 import sys
+import traceback
 import pyautogui
 from PyQt6.QtCore import Qt, QTimer
 from src.screen_capture import ScreenCaptureOverlay
@@ -123,26 +124,15 @@ class ScreenshotApp(QMainWindow):
             try:
                 # Add debug info about the screenshot
                 print(f"Received screenshot for annotation: {type(screenshot)}")
-                if hasattr(screenshot, 'width') and hasattr(screenshot, 'height'):
-                    print(f"Screenshot dimensions: {screenshot.width}x{screenshot.height}")
-                elif hasattr(screenshot, 'size'):
+                if callable(getattr(screenshot, 'size', None)):
                     print(f"Screenshot size: {screenshot.size()}")
+                elif hasattr(screenshot, 'width') and hasattr(screenshot, 'height'):
+                    print(f"Screenshot dimensions: {screenshot.width}x{screenshot.height}")
                 else:
                     print("Screenshot has no readable dimensions")
                     
-                # Ensure it's a PIL Image
-                from PIL import Image
-                if not isinstance(screenshot, Image.Image):
-                    print("Converting screenshot to PIL Image...")
-                    if hasattr(screenshot, 'toImage'):
-                        qimg = screenshot.toImage()
-                        # Convert QImage to PIL Image
-                        from PyQt6.QtGui import QImage
-                        buffer = qimg.bits().asstring(qimg.sizeInBytes())
-                        screenshot = Image.frombuffer("RGBA", (qimg.width(), qimg.height()), buffer, "raw", "RGBA", 0, 1)
-                    else:
-                        print("Cannot convert screenshot to PIL Image - unknown type")
-                
+                # PIL images, QImages and QPixmaps are all accepted by the
+                # annotation window, so Qt captures are passed through as is
                 print(f"Creating annotation window with screenshot: {screenshot}")
                 self.annotation_window = AnnotationWindow(screenshot, self)
                 self.annotation_window.show()
@@ -157,14 +147,12 @@ class ScreenshotApp(QMainWindow):
             except Exception as e:
                 # If there's an error with annotation window
                 print(f"Error opening annotation window: {e}")
-                import traceback
                 traceback.print_exc()
                 QMessageBox.warning(self, "Error", f"Failed to open screenshot: {str(e)}")
         else:
             # Indicate canceled or failed capture
             print("\n=== SCREENSHOT FAILED OR CANCELED ===")
             # Print a stack trace to show where the failure happened
-            import traceback
             traceback.print_stack()
             print("=== END OF ERROR TRACE ===\n")
             self.statusBar().showMessage("Screenshot canceled or failed", 3000)
@@ -181,4 +169,32 @@ class ScreenshotApp(QMainWindow):
         # Clean up any resources
         if self.annotation_window:
             self.annotation_window.close()
-        event.accept()
\ No newline at end of file
+        event.accept()
+
+
+class DirectCaptureHandler(QWidget):
+    """Minimal capture parent used by direct capture mode in place of the main window.
+    
+    Opens the annotation window for a completed capture, or quits the
+    application if the capture was canceled.
+    """
+    
+    def __init__(self):
+        super().__init__()
+        self.annotation_window = None
+        
+    def on_capture_complete(self, screenshot):
+        """Handle completed screenshot capture"""
+        if screenshot:
+            try:
+                # Create annotation window
+                self.annotation_window = AnnotationWindow(screenshot, None)
+                self.annotation_window.show()
+            except Exception as e:
+                print(f"Error opening annotation window: {e}")
+                traceback.print_exc()
+        # Exit if no screenshot was captured (user canceled)
+        else:
+            print("No screenshot captured, exiting")
+            # Use a timer to allow for clean shutdown
+            QTimer.singleShot(500, QApplication.instance().quit)
@@ -4,34 +4,196 @@ macOS Screenshot Utility - Background Service Mode
 """
 import os
 import sys
+import copy
 import time
-import json
+import traceback
+import atexit
+import operator
+import functools
 import rumps
+import Quartz
 import threading
 import tempfile
 import subprocess
 from pathlib import Path
-from pynput import keyboard
-from PyQt6.QtWidgets import QApplication
-from src.screen_capture import ScreenCaptureOverlay
-from src.screenshot_app import ScreenshotApp
+from types import MappingProxyType
+from concurrent.futures import ThreadPoolExecutor
+from Foundation import NSDistributedNotificationCenter, NSOperationQueue
+from src.preferences_io import dumps_preferences, read_preferences, write_preferences
+from src.keyboard_layout import LAYOUT_CHANGED_NOTIFICATION, character_key_codes
 
-# Default preferences
-DEFAULT_PREFERENCES = {
-    "hotkey": {"key": "4", "modifiers": ["command", "shift"]},
+# Home-relative paths, resolved once at import
+_HOME = os.path.expanduser("~")
+PREFERENCES_PATH = os.path.join(_HOME, ".screenshot_util_preferences.json")
+DEFAULT_SCREENSHOTS_DIR = os.path.join(_HOME, "Screenshots")
+LAUNCH_AGENTS_DIR = os.path.join(_HOME, "Library", "LaunchAgents")
+LAUNCH_AGENT_LABEL = "com.user.screenshotutil"
+LAUNCH_AGENT_PATH = os.path.join(LAUNCH_AGENTS_DIR, LAUNCH_AGENT_LABEL + ".plist")
+
+# Environment for capture processes; stops Qt making them regular apps with
+# a Dock icon (they hide themselves once started, see main.py)
+_CAPTURE_PROCESS_ENV = dict(os.environ, QT_MAC_DISABLE_FOREGROUND_APPLICATION_TRANSFORM="1")
+
+# Files that ship with the app, resolved once at import
+_SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+MENU_ICON_PATH = os.path.join(_SRC_DIR, "..", "menu_icon.png")
+RUN_SCRIPT_PATH = os.path.join(_SRC_DIR, "..", "run.py")
+HOTKEY_DIALOG_PATH = os.path.join(_SRC_DIR, "preferences_dialog.py")
+
+# Launch agent plist; @@PYTHON@@ and @@APP@@ are filled in by setup_launch_agent
+_PLIST_TEMPLATE = b"""<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE plist PUBLIC "-//Apple//DTD PLIST 1.0//EN" "http://www.apple.com/DTDs/PropertyList-1.0.dtd">
+<plist version="1.0">
+<dict>
+    <key>Label</key>
+    <string>com.user.screenshotutil</string>
+    <key>ProgramArguments</key>
+    <array>
+        <string>@@PYTHON@@</string>
+        <string>@@APP@@</string>
+        <string>--service</string>
+    </array>
+    <key>RunAtLoad</key>
+    <true/>
+    <key>KeepAlive</key>
+    <dict>
+        <key>SuccessfulExit</key>
+        <false/>
+    </dict>
+    <key>ProcessType</key>
+    <string>Interactive</string>
+    <key>ThrottleInterval</key>
+    <integer>5</integer>
+</dict>
+</plist>
+"""
+
+# Seconds to wait for further changes before writing the preferences file
+SAVE_DELAY = 0.5
+
+# Nanoseconds within which a repeated hotkey press is ignored
+HOTKEY_DEBOUNCE_NS = 300_000_000
+
+# Seconds within which an identical notification is not shown again
+NOTIFY_REPEAT_INTERVAL = 0.3
+
+# Default preferences; read-only, use default_preferences() for a copy to modify
+DEFAULT_PREFERENCES = MappingProxyType({
+    "hotkey": MappingProxyType({"key": "4", "modifiers": ("command", "shift")}),
     "save_location": "~/Screenshots",
     "auto_launch": True
+})
+
+
+def default_preferences():
+    """Build a new, mutable copy of the default preferences.
+    
+    Returns:
+        dict: The defaults, with their own hotkey dict and modifiers list
+    """
+    hotkey = DEFAULT_PREFERENCES["hotkey"]
+    preferences = dict(DEFAULT_PREFERENCES)
+    preferences["hotkey"] = {"key": hotkey["key"], "modifiers": list(hotkey["modifiers"])}
+    return preferences
+
+
+def run_on_main_thread(func):
+    """Have the main run loop call func soon; safe to call from any thread.
+    
+    Args:
+        func: Callable taking no arguments
+    """
+    main_loop = Quartz.CFRunLoopGetMain()
+    Quartz.CFRunLoopPerformBlock(main_loop, Quartz.kCFRunLoopCommonModes, func)
+    Quartz.CFRunLoopWakeUp(main_loop)
+
+# macOS virtual key codes (kVK_F*) of the function keys a hotkey can use.
+# Other keys depend on the keyboard layout, see keyboard_layout.py.
+_FUNCTION_KEY_CODES = {
+    "f1": 0x7A, "f2": 0x78, "f3": 0x63, "f4": 0x76, "f5": 0x60, "f6": 0x61,
+    "f7": 0x62, "f8": 0x64, "f9": 0x65, "f10": 0x6D, "f11": 0x67, "f12": 0x6F,
 }
 
+# Event flag for each modifier name used in the preferences
+_MODIFIER_FLAGS = {
+    "command": Quartz.kCGEventFlagMaskCommand,
+    "shift": Quartz.kCGEventFlagMaskShift,
+    "control": Quartz.kCGEventFlagMaskControl,
+    "option": Quartz.kCGEventFlagMaskAlternate,
+}
+_ALL_MODIFIER_FLAGS = functools.reduce(operator.or_, _MODIFIER_FLAGS.values())
+
 class HotkeyListener:
-    """Global hotkey listener for triggering the screenshot utility"""
+    """Global hotkey listener for triggering the screenshot utility.
+    
+    Key presses are watched with a listen-only Quartz event tap on a
+    dedicated thread. The tap only receives key-down events, and matching
+    is a key code and flag comparison, so other keys cost next to nothing.
+    The hotkey's character is looked up in the current keyboard layout, and
+    looked up again when the user switches layouts.
+    """
     
     def __init__(self, callback, preferences=None):
         self.callback = callback
-        self.preferences = preferences or DEFAULT_PREFERENCES.copy()  # Use a copy to prevent shared references
-        self.listener = None
+        self.preferences = preferences or DEFAULT_PREFERENCES  # Only read, never modified
         self.running = False
-        self.hotkey = None
+        self._tap = None
+        self._run_loop = None
+        self._thread = None
+        self._last_activation_ns = 0  # time.monotonic_ns() of the last accepted press
+        self._layout_key_codes = character_key_codes()
+        self.hotkey, self._hotkey_name = self._parse_hotkey(self.preferences)
+        
+        # Characters move to other keys when the keyboard layout changes
+        NSDistributedNotificationCenter.defaultCenter().addObserverForName_object_queue_usingBlock_(
+            LAYOUT_CHANGED_NOTIFICATION, None, NSOperationQueue.mainQueue(), self._on_layout_changed)
+    
+    def _parse_hotkey(self, preferences):
+        """Translate the hotkey preferences into what the event tap matches.
+        
+        Args:
+            preferences: The preferences dictionary
+            
+        Returns:
+            tuple: ((key code, modifier flags) or None if the key isn't
+            supported, readable hotkey name)
+        """
+        hotkey_config = preferences.get("hotkey") or DEFAULT_PREFERENCES["hotkey"]
+        hotkey_key = hotkey_config.get("key", "4").lower()
+        modifier_names = hotkey_config.get("modifiers", ["command", "shift"])
+        name = '+'.join(list(modifier_names) + [hotkey_key])
+        
+        key_code = _FUNCTION_KEY_CODES.get(hotkey_key, self._layout_key_codes.get(hotkey_key))
+        if key_code is None:
+            return None, name
+        flags = 0
+        for mod in modifier_names:
+            flags |= _MODIFIER_FLAGS.get(mod, 0)
+        return (key_code, flags), name
+    
+    def _on_layout_changed(self, notification):
+        """Look the hotkey up again in the newly selected keyboard layout; runs on the main thread"""
+        self._layout_key_codes = character_key_codes()
+        self.update_preferences(self.preferences)
+    
+    def update_preferences(self, preferences):
+        """Switch to the hotkey in new preferences.
+        
+        A running tap is kept; _on_event picks up the new hotkey on the next
+        key press. The listener is only started or stopped when needed.
+        
+        Args:
+            preferences: The preferences dictionary
+        """
+        self.preferences = preferences
+        self.hotkey, self._hotkey_name = self._parse_hotkey(preferences)
+        if self.hotkey is None:
+            print(f"Unsupported hotkey: {self._hotkey_name}")
+            self.stop()
+        elif self.running:
+            print(f"Hotkey changed to: {self._hotkey_name}")
+        else:
+            self.start()
         
     def start(self):
         """Start listening for hotkeys"""
@@ -39,131 +201,107 @@ class HotkeyListener:
             # If already running, stop first to ensure clean restart
             self.stop()
             
-        # Safety delay to ensure previous listener is fully stopped
-        time.sleep(0.1)
-            
-        self.running = True
-        
-        # Get hotkey configuration from preferences - make a deep copy
-        # to ensure we don't accidentally modify the original preferences
-        hotkey_config = self.preferences.get("hotkey", {}).copy()
-        if not hotkey_config:
-            hotkey_config = DEFAULT_PREFERENCES["hotkey"].copy()
-            
-        hotkey_key = hotkey_config.get("key", "4")
-        
-        # Convert modifiers to pynput format
-        modifiers = []
-        modifier_names = []
-        for mod in hotkey_config.get("modifiers", ["command", "shift"]):
-            if mod == "command":
-                modifiers.append(keyboard.Key.cmd)
-                modifier_names.append("cmd")
-            elif mod == "shift":
-                modifiers.append(keyboard.Key.shift)
-                modifier_names.append("shift")
-            elif mod == "control":
-                modifiers.append(keyboard.Key.ctrl)
-                modifier_names.append("ctrl")
-            elif mod == "option":
-                modifiers.append(keyboard.Key.alt)
-                modifier_names.append("alt")
-        
-        # Debug output
-        print(f"Setting up hotkey with modifiers: {modifier_names} and key: {hotkey_key}")
+        if self.hotkey is None:
+            print(f"Unsupported hotkey: {self._hotkey_name}")
+            return
         
+        # The tap and its run loop live on their own thread; wait until it
+        # has either installed the tap or failed to
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._run_tap, args=(ready,), daemon=True)
+        self._thread.start()
+        ready.wait()
+        
+        if self._tap is None:
+            print("Error setting up hotkey listener: could not create event tap "
+                  "(is Accessibility access granted?)")
+            self._thread.join()
+            self._thread = None
+            return
+        self.running = True
+        print(f"Hotkey listener started with hotkey: {self._hotkey_name}")
+    
+    def _run_tap(self, ready):
+        """Install the event tap and run its run loop until stop() is called"""
         try:
-            # Create a hotkey combination string
-            hotkey_str = '+'.join([f'<{m.name}>' if hasattr(m, 'name') else str(m) for m in modifiers] + [hotkey_key])
-            print(f"Hotkey string: {hotkey_str}")
-            
-            # Create hotkey combination
-            self.hotkey = keyboard.HotKey(
-                keyboard.HotKey.parse(hotkey_str),
-                self.on_hotkey_activated
+            self._tap = Quartz.CGEventTapCreate(
+                Quartz.kCGSessionEventTap,
+                Quartz.kCGHeadInsertEventTap,
+                Quartz.kCGEventTapOptionListenOnly,
+                Quartz.CGEventMaskBit(Quartz.kCGEventKeyDown),
+                self._on_event,
+                None
             )
-            
-            # Start the listener
-            self.listener = keyboard.Listener(on_press=self.on_key_press, on_release=self.on_key_release)
-            self.listener.start()
-            print(f"Hotkey listener started with hotkey: {'+'.join(modifier_names + [hotkey_key])}")
-        except Exception as e:
-            print(f"Error setting up hotkey listener: {e}")
-            import traceback
-            traceback.print_exc()
-            self.running = False
+            if self._tap is None:
+                return
+            source = Quartz.CFMachPortCreateRunLoopSource(None, self._tap, 0)
+            self._run_loop = Quartz.CFRunLoopGetCurrent()
+            Quartz.CFRunLoopAddSource(self._run_loop, source, Quartz.kCFRunLoopCommonModes)
+            Quartz.CGEventTapEnable(self._tap, True)
+        finally:
+            ready.set()
+        Quartz.CFRunLoopRun()
         
     def stop(self):
         """Stop listening for hotkeys"""
-        if self.listener:
+        if self._tap is not None:
             try:
-                self.listener.stop()
-                # Wait for listener to fully stop
-                if hasattr(self.listener, 'join'):
-                    self.listener.join(0.5)
+                Quartz.CGEventTapEnable(self._tap, False)
+                Quartz.CFRunLoopStop(self._run_loop)
+                # Wait for the tap thread to finish
+                self._thread.join(0.5)
             except Exception as e:
                 print(f"Error stopping listener: {e}")
             finally:
-                self.listener = None
+                self._tap = None
+                self._run_loop = None
+                self._thread = None
                 self.running = False
                 print("Hotkey listener stopped")
-            
-    def on_key_press(self, key):
-        """Handle key press events from the global keyboard listener.
-        
-        Passes the key press to the hotkey processor for detection
-        of hotkey combinations.
-        
-        Args:
-            key: The key object representing the pressed key
-            
-        Returns:
-            None
-        """
-        if not self.hotkey:
-            return
-            
-        try:
-            # Pass to hotkey processor - using the key directly
-            self.hotkey.press(key)
-        except Exception as e:
-            # Most errors here are normal (e.g. wrong key combinations)
-            # so we don't need to print them all
-            pass
-            
-    def on_key_release(self, key):
-        """Handle key release events from the global keyboard listener.
-        
-        Passes the key release to the hotkey processor for detection
-        of completed hotkey combinations.
+    
+    def _on_event(self, proxy, event_type, event, refcon):
+        """Event tap callback, run on the tap thread for every key-down event.
         
         Args:
-            key: The key object representing the released key
+            proxy: The tap proxy (unused)
+            event_type: The CGEventType of the event
+            event: The CGEvent
+            refcon: User data given to CGEventTapCreate (unused)
             
         Returns:
-            None
+            The event, unchanged; the tap only listens
         """
-        if not self.hotkey:
-            return
-            
-        try:
-            # Pass to hotkey processor - using the key directly
-            self.hotkey.release(key)
-        except Exception as e:
-            # Most errors here are normal (e.g. wrong key combinations)
-            # so we don't need to print them all
-            pass
+        if event_type == Quartz.kCGEventTapDisabledByTimeout:
+            # macOS disables taps that respond too slowly; turn it back on
+            Quartz.CGEventTapEnable(self._tap, True)
+            return event
+        
+        # Holding the hotkey down shouldn't start a capture per repeat
+        if Quartz.CGEventGetIntegerValueField(event, Quartz.kCGKeyboardEventAutorepeat):
+            return event
+        
+        key_code = Quartz.CGEventGetIntegerValueField(event, Quartz.kCGKeyboardEventKeycode)
+        flags = Quartz.CGEventGetFlags(event) & _ALL_MODIFIER_FLAGS
+        if (key_code, flags) == self.hotkey:
+            # Leave the tap callback quickly; the callback runs on the main run loop
+            run_on_main_thread(self.on_hotkey_activated)
+        return event
             
     def on_hotkey_activated(self):
         """Handle hotkey activation when the configured key combination is pressed.
         
         Triggered when the full hotkey combination has been detected.
         Calls the callback function provided during initialization,
-        which typically initiates the screenshot capture process.
+        which typically initiates the screenshot capture process. Presses
+        within HOTKEY_DEBOUNCE_NS of the last accepted one are ignored.
         
         Returns:
             None
         """
+        now = time.monotonic_ns()
+        if now - self._last_activation_ns < HOTKEY_DEBOUNCE_NS:
+            return
+        self._last_activation_ns = now
         print("Hotkey activated!")
         self.callback()
 
@@ -205,18 +343,23 @@ class ScreenshotUtilService(rumps.App):
         ScreenshotUtilService._instance_running = True
             
         # Check if we have a custom icon, otherwise use emoji
-        icon_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "menu_icon.png")
-        icon = icon_path if os.path.exists(icon_path) else "📷"
+        icon = MENU_ICON_PATH if os.path.exists(MENU_ICON_PATH) else "📷"
         
         super().__init__("Screenshot", icon=icon, quit_button=None)
         
-        # Initialize preferences
-        self.preferences_path = os.path.expanduser("~/.screenshot_util_preferences.json")
+        # Initialize preferences; saves are batched on a timer and flushed at exit
+        self._save_lock = threading.Lock()
+        self._last_notification = (None, 0.0)  # (title, message), time shown
+        self._save_timer = None
+        self._pending_preferences = None
+        atexit.register(self.flush_preferences)
+        self.preferences_path = PREFERENCES_PATH
         self.preferences = self.load_preferences()
+        self._saved_preferences = copy.deepcopy(self.preferences)  # What the file holds
         
         # Make sure we have a properly formatted hotkey configuration
         if "hotkey" not in self.preferences or not isinstance(self.preferences["hotkey"], dict):
-            self.preferences["hotkey"] = DEFAULT_PREFERENCES["hotkey"].copy()
+            self.preferences["hotkey"] = default_preferences()["hotkey"]
             self.save_preferences()
         
         # Create the QApplication instance for Qt components
@@ -226,10 +369,17 @@ class ScreenshotUtilService(rumps.App):
         
         # Initialize hotkey listener
         self.hotkey_listener = HotkeyListener(self.take_screenshot, self.preferences)
+        self._hotkey_dialog_thread = None  # Waits for the hotkey dialog while it's open
         
         # Initialize screenshot components
         self.screen_capture = None
         self.annotation_window = None
+        self._capture_worker = ThreadPoolExecutor(max_workers=1)  # Starts capture processes
+        self._standby_process = None  # Capture process waiting for the hotkey; worker only
+        self._children = set()  # Capture processes that may still be running
+        
+        # launchctl calls run here, in order, so they never block the menu
+        self._launch_agent_worker = ThreadPoolExecutor(max_workers=1)
         
         # Setup menu
         self.setup_menu()
@@ -237,10 +387,22 @@ class ScreenshotUtilService(rumps.App):
         # Start the hotkey listener
         self.hotkey_listener.start()
         
+        # Have a capture process ready for the first screenshot
+        self._capture_worker.submit(self._prepare_standby_process)
+        
         # Setup launch agent if auto launch is enabled
         if self.preferences.get("auto_launch", True):
-            self.setup_launch_agent()
+            self._launch_agent_worker.submit(self.setup_launch_agent)
         
+    def _notify(self, title, message):
+        """Show a notification from the menu bar app, unless it just showed the same one"""
+        now = time.monotonic()
+        last, shown_at = self._last_notification
+        if last == (title, message) and now - shown_at < NOTIFY_REPEAT_INTERVAL:
+            return
+        self._last_notification = ((title, message), now)
+        rumps.notification(title=title, subtitle="", message=message, icon=None)
+    
     def setup_menu(self):
         """Set up the menu bar menu"""
         # Take Screenshot menu item
@@ -275,35 +437,65 @@ class ScreenshotUtilService(rumps.App):
         """Take a screenshot using the screen capture overlay"""
         print("Taking screenshot...")
         
-        # We need to run the screenshot capture directly but without showing the main UI
+        # rumps and PyQt6 can't share the main thread, so the capture runs in
+        # a separate process. The hand-off happens on the capture worker so
+        # the menu bar never waits for a process to start.
+        self._capture_worker.submit(self._request_capture)
+        
+        # Show notification
+        self._notify("Screenshot Utility", "Select a region to capture")
+    
+    def _prepare_standby_process(self):
+        """Start a capture process to wait for the next hotkey press; runs on _capture_worker"""
         try:
-            # Use direct subprocess call to run the screenshot command in direct capture mode
-            script_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "run.py")
-            # Run in background with direct-capture flag
-            subprocess.Popen([sys.executable, script_path, "--direct-capture"], 
-                             stdout=subprocess.PIPE, 
-                             stderr=subprocess.PIPE)
-            
-            # Show notification
-            rumps.notification(
-                title="Screenshot Utility",
-                subtitle="",
-                message="Select a region to capture",
-                icon=None
-            )
-            
+            self._standby_process = self._spawn_capture_process()
+        except OSError as e:
+            print(f"Error starting capture process: {e}")
+    
+    def _request_capture(self):
+        """Hand a capture request to the standby process; runs on _capture_worker.
+        
+        The standby process has Qt already imported, so the overlay appears
+        without an interpreter cold start. If it's missing or has exited, a
+        new process is started for this capture. Afterwards the next standby
+        process is started.
+        """
+        proc, self._standby_process = self._standby_process, None
+        try:
+            if proc is None or proc.poll() is not None:
+                proc = self._spawn_capture_process()
+            proc.stdin.write(b"capture\n")
+            proc.stdin.close()
         except Exception as e:
             print(f"Error launching screenshot tool: {e}")
-            import traceback
             traceback.print_exc()
             
             # Show error notification
-            rumps.notification(
-                title="Screenshot Error",
-                subtitle="",
-                message=f"Error launching screenshot tool: {str(e)}",
-                icon=None
-            )
+            run_on_main_thread(functools.partial(
+                self._notify, "Screenshot Error", f"Error launching screenshot tool: {str(e)}"))
+            return
+        
+        self._prepare_standby_process()
+    
+    def _spawn_capture_process(self):
+        """Start a direct capture process that waits for a request on stdin.
+        
+        Only called on _capture_worker, which also owns _children. Qt is told
+        not to turn the process into a regular (Dock) app while it starts.
+        
+        Returns:
+            subprocess.Popen: The waiting process
+        """
+        proc = subprocess.Popen([sys.executable, RUN_SCRIPT_PATH, "--direct-capture", "--standby"],
+                                stdin=subprocess.PIPE,
+                                stdout=subprocess.DEVNULL,
+                                stderr=subprocess.DEVNULL,
+                                env=_CAPTURE_PROCESS_ENV)
+        
+        # Track it so quit_app can stop it, forgetting (and reaping) finished ones
+        self._children = {p for p in self._children if p.poll() is None}
+        self._children.add(proc)
+        return proc
     
     def initialize_qt_app(self):
         """Initialize the Qt application for screenshot operations.
@@ -316,7 +508,10 @@ class ScreenshotUtilService(rumps.App):
             None. Sets self.qt_app to the QApplication instance.
         """
         # Instead of running QApplication in a separate thread,
-        # we'll create it on demand when needed for screenshot operations
+        # we'll create it on demand when needed for screenshot operations.
+        # Qt is imported here too, so the menu bar service starts without it.
+        from PyQt6.QtWidgets import QApplication
+        
         print("Initializing Qt application")
         if QApplication.instance() is None:
             # No QApplication exists, create one
@@ -329,13 +524,13 @@ class ScreenshotUtilService(rumps.App):
     def on_capture_complete(self, screenshot):
         """Handle a completed screenshot capture operation.
         
-        Processes the captured screenshot by saving it to a temporary file
-        and opening it with the default image viewer. Shows notification
-        of success or failure.
+        Processes the captured screenshot by saving it to the configured save
+        location and opening it with the default image viewer. Shows
+        notification of success or failure.
         
         Args:
-            screenshot: A PIL Image object containing the captured screenshot,
-                       or None if capture was canceled or failed
+            screenshot: A PIL Image or Qt image (QPixmap/QImage) containing the
+                       captured screenshot, or None if capture was canceled or failed
                        
         Returns:
             None
@@ -345,81 +540,131 @@ class ScreenshotUtilService(rumps.App):
                 # Add debug info about the screenshot
                 print(f"Received screenshot for annotation: {type(screenshot)}")
                 
-                # Create a temporary file to save the screenshot
-                temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.png')
-                temp_file.close()
-                screenshot.save(temp_file.name)
+                # Save the screenshot where the user keeps them
+                save_dir = os.path.expanduser(self.preferences.get("save_location", "~/Screenshots"))
+                os.makedirs(save_dir, exist_ok=True)
+                file_path = self._reserve_screenshot_path(save_dir)
+                
+                # Fast zlib compression; size barely matters here
+                try:
+                    try:
+                        screenshot.save(file_path, compress_level=1)  # PIL
+                    except TypeError:
+                        # A Qt image; Qt is only loaded in this process if the capture came from it
+                        from src.annotation_window import PNG_SAVE_QUALITY
+                        if not screenshot.save(file_path, "PNG", PNG_SAVE_QUALITY):
+                            raise OSError(f"Could not write {file_path}")
+                except Exception:
+                    # Don't leave the reserved, empty file behind
+                    os.unlink(file_path)
+                    raise
                 
-                # Open the image with Preview app for now
+                # Open the image with Preview app for now, without waiting for it
                 # In future this should use our own annotation window when Qt integration is better
-                subprocess.run(['open', temp_file.name], check=True)
+                subprocess.Popen(['open', file_path])
                 
                 # Show notification
-                rumps.notification(
-                    title="Screenshot Captured",
-                    subtitle="",
-                    message="Screenshot has been captured successfully",
-                    icon=None
-                )
+                self._notify("Screenshot Captured", "Screenshot has been captured successfully")
                 
             except Exception as e:
                 print(f"Error processing screenshot: {e}")
-                import traceback
                 traceback.print_exc()
                 
                 # Show error notification
-                rumps.notification(
-                    title="Screenshot Error",
-                    subtitle="",
-                    message=f"Error processing screenshot: {str(e)}",
-                    icon=None
-                )
+                self._notify("Screenshot Error", f"Error processing screenshot: {str(e)}")
         else:
             # Indicate canceled or failed capture
             print("Screenshot was canceled or failed")
     
+    @staticmethod
+    def _reserve_screenshot_path(save_dir):
+        """Create an empty file with a new, timestamped screenshot name.
+        
+        Names only have one-second resolution, so a number is added, as
+        macOS does, when a screenshot with that name already exists.
+        
+        Args:
+            save_dir: Directory to save the screenshot in
+            
+        Returns:
+            str: Path of the new file
+        """
+        base = time.strftime("Screenshot %Y-%m-%d at %H.%M.%S")
+        file_path = os.path.join(save_dir, base + ".png")
+        number = 1
+        while True:
+            try:
+                os.close(os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644))
+                return file_path
+            except FileExistsError:
+                number += 1
+                file_path = os.path.join(save_dir, f"{base} ({number}).png")
+    
     def open_hotkey_settings(self, _):
-        """Open dialog to configure hotkeys"""
+        """Open dialog to configure hotkeys.
+        
+        The dialog runs in a separate Python process, because rumps (the menu
+        bar app) and PyQt6 can't run in the same thread. It's waited for on a
+        worker thread so the menu bar stays responsive, and the result is
+        applied on the main thread by _finish_hotkey_settings.
+        """
+        if self._hotkey_dialog_thread is not None:
+            print("Hotkey settings dialog is already open")
+            return
         try:
-            # Create and launch a separate Python process to run the PyQt6 dialog
-            # This is needed because rumps (the menu bar app) and PyQt6 can't run in the same thread
-            import subprocess
-            import tempfile
-            import json
-            import os
-            
-            # Get current hotkey settings
-            current_hotkey = self.preferences.get("hotkey", {"key": "4", "modifiers": ["command", "shift"]})
-            
-            # Create a temporary file to store the updated hotkey settings
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.json', mode='w') as tmp:
+            # Create a temporary file to pass the settings to and from the dialog
+            with tempfile.NamedTemporaryFile(delete=False, suffix='.json') as tmp:
                 tmp_path = tmp.name
                 # Write current settings to the temp file
-                json.dump(self.preferences, tmp)
-            
-            # Get path to the preferences dialog module
-            dialog_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "preferences_dialog.py")
+                tmp.write(dumps_preferences(self.preferences))
             
             # Run the dialog script
             print(f"Launching hotkey settings dialog with config: {tmp_path}")
-            result = subprocess.run([sys.executable, dialog_path, tmp_path], 
-                                  capture_output=True, text=True)
+            self._hotkey_dialog_thread = threading.Thread(target=self._run_hotkey_dialog,
+                                                          args=(tmp_path,), daemon=True)
+            self._hotkey_dialog_thread.start()
+        except Exception as e:
+            print(f"Error opening hotkey settings dialog: {e}")
+            traceback.print_exc()
+            self._hotkey_dialog_thread = None
+            self._show_hotkey_settings_error(e)
+    
+    def _run_hotkey_dialog(self, tmp_path):
+        """Wait for the dialog process on a worker thread, then pass the outcome to the main thread"""
+        returncode, error = None, None
+        try:
+            result = subprocess.run([sys.executable, HOTKEY_DIALOG_PATH, tmp_path],
+                                    capture_output=True, text=True)
+            returncode = result.returncode
+        except Exception as e:
+            error = e
+        run_on_main_thread(functools.partial(self._finish_hotkey_settings, tmp_path, returncode, error))
+    
+    def _finish_hotkey_settings(self, tmp_path, returncode, error):
+        """Apply the result of the hotkey dialog; runs on the main thread.
+        
+        Args:
+            tmp_path: The settings file shared with the dialog
+            returncode: Exit status of the dialog process, 0 if it was saved
+            error: Exception raised while running the dialog, or None
+        """
+        self._hotkey_dialog_thread = None
+        try:
+            if error is not None:
+                raise error
             
             # Check if the dialog was accepted (saved)
-            if result.returncode == 0:  # Success
+            if returncode == 0:  # Success
                 print("Dialog accepted, updating preferences")
                 # Load updated preferences
-                with open(tmp_path, 'r') as f:
-                    updated_prefs = json.load(f)
+                updated_prefs = read_preferences(tmp_path)
                 
                 # Update our preferences
                 self.preferences["hotkey"] = updated_prefs["hotkey"]
                 self.save_preferences()
                 
-                # Restart hotkey listener
-                self.hotkey_listener.stop()
-                self.hotkey_listener = HotkeyListener(self.take_screenshot, self.preferences)
-                self.hotkey_listener.start()
+                # Switch the hotkey listener over to the new hotkey
+                self.hotkey_listener.update_preferences(self.preferences)
                 
                 # Get the updated hotkey for the notification
                 hotkey = self.preferences["hotkey"]
@@ -427,43 +672,37 @@ class ScreenshotUtilService(rumps.App):
                 modifiers = [m.capitalize() for m in hotkey.get("modifiers", [])]
                 
                 # Show confirmation in the menu bar app
-                rumps.notification(
-                    title="Hotkey Changed",
-                    subtitle="",
-                    message=f"Screenshot hotkey changed to {'+'.join(modifiers + [key])}",
-                    icon=None
-                )
+                self._notify("Hotkey Changed", f"Screenshot hotkey changed to {'+'.join(modifiers + [key])}")
             else:
                 print("Dialog canceled or failed")
-                
+        except Exception as e:
+            print(f"Error opening hotkey settings dialog: {e}")
+            traceback.print_exc()
+            self._show_hotkey_settings_error(e)
+        finally:
             # Clean up temporary files
             try:
                 os.unlink(tmp_path)
             except Exception as e:
                 print(f"Error cleaning up temporary files: {e}")
-                
-        except Exception as e:
-            print(f"Error opening hotkey settings dialog: {e}")
-            import traceback
-            traceback.print_exc()
-            
-            # Fallback to simple alert if there's an error
-            current_hotkey = self.preferences.get("hotkey", {"key": "4", "modifiers": ["command", "shift"]})
-            current_key = current_hotkey.get("key", "4")
-            current_modifiers = ", ".join([m.capitalize() for m in current_hotkey.get("modifiers", ["command", "shift"])])
-            
-            rumps.alert(
-                title="Preferences",
-                message=f"Error opening hotkey settings: {str(e)}\n\n"
-                       f"Current hotkey: {current_modifiers}+{current_key.upper()}\n\n"
-                       f"You can edit ~/.screenshot_util_preferences.json directly.",
-                ok="OK"
-            )
+    
+    def _show_hotkey_settings_error(self, error):
+        """Fallback to simple alert if the hotkey dialog couldn't be used"""
+        current_hotkey = self.preferences.get("hotkey", {"key": "4", "modifiers": ["command", "shift"]})
+        current_key = current_hotkey.get("key", "4")
+        current_modifiers = ", ".join([m.capitalize() for m in current_hotkey.get("modifiers", ["command", "shift"])])
+        
+        rumps.alert(
+            title="Preferences",
+            message=f"Error opening hotkey settings: {str(error)}\n\n"
+                   f"Current hotkey: {current_modifiers}+{current_key.upper()}\n\n"
+                   f"You can edit ~/.screenshot_util_preferences.json directly.",
+            ok="OK"
+        )
     
     def set_save_location(self, _):
         """Set the default save location for screenshots"""
         current_location = self.preferences.get("save_location", "~/Screenshots")
-        expanded_path = os.path.expanduser(current_location)
         
         # Show current location
         response = rumps.alert(
@@ -479,17 +718,9 @@ class ScreenshotUtilService(rumps.App):
             self.preferences["save_location"] = "~/Screenshots"
             self.save_preferences()
             
-            # Ensure the directory exists
-            screenshots_dir = os.path.expanduser("~/Screenshots")
-            os.makedirs(screenshots_dir, exist_ok=True)
-            
-            # Show confirmation
-            rumps.notification(
-                title="Save Location Changed",
-                subtitle="",
-                message="Screenshots will be saved to ~/Screenshots",
-                icon=None
-            )
+            # Ensure the directory exists; the alert's button already said
+            # where screenshots go, so no notification is needed
+            os.makedirs(DEFAULT_SCREENSHOTS_DIR, exist_ok=True)
     
     def toggle_auto_launch(self, _):
         """Toggle auto launch at login"""
@@ -506,76 +737,67 @@ class ScreenshotUtilService(rumps.App):
         
         # Setup or remove launch agent
         if new_setting:
-            self.setup_launch_agent()
+            self._launch_agent_worker.submit(self.setup_launch_agent)
         else:
-            self.remove_launch_agent()
+            self._launch_agent_worker.submit(self.remove_launch_agent)
         
         # Show confirmation
-        rumps.notification(
-            title="Auto Launch Setting Changed",
-            subtitle="",
-            message=f"Auto launch at login: {auto_launch_status}",
-            icon=None
-        )
+        self._notify("Auto Launch Setting Changed", f"Auto launch at login: {auto_launch_status}")
     
     def setup_launch_agent(self):
-        """Set up launch agent for auto-launch at login"""
+        """Set up launch agent for auto-launch at login.
+        
+        An up-to-date plist isn't rewritten, and launchctl is skipped when
+        this process was started by the agent, since it's loaded already.
+        This waits for launchctl, so the app runs it on _launch_agent_worker.
+        """
         try:
             # Get the path to the current script
             app_path = os.path.abspath(sys.argv[0])
             
-            # Create the launch agent plist content
-            plist_content = f"""<?xml version="1.0" encoding="UTF-8"?>
-<!DOCTYPE plist PUBLIC "-//Apple//DTD PLIST 1.0//EN" "http://www.apple.com/DTDs/PropertyList-1.0.dtd">
-<plist version="1.0">
-<dict>
-    <key>Label</key>
-    <string>com.user.screenshotutil</string>
-    <key>ProgramArguments</key>
-    <array>
-        <string>{sys.executable}</string>
-        <string>{app_path}</string>
-        <string>--service</string>
-    </array>
-    <key>RunAtLoad</key>
-    <true/>
-    <key>KeepAlive</key>
-    <dict>
-        <key>SuccessfulExit</key>
-        <false/>
-    </dict>
-    <key>ProcessType</key>
-    <string>Interactive</string>
-    <key>ThrottleInterval</key>
-    <integer>5</integer>
-</dict>
-</plist>
-"""
-            
-            # Create the LaunchAgents directory if it doesn't exist
-            launch_agents_dir = os.path.expanduser("~/Library/LaunchAgents")
-            os.makedirs(launch_agents_dir, exist_ok=True)
+            # Fill in the interpreter and script paths
+            plist_content = (_PLIST_TEMPLATE
+                             .replace(b"@@PYTHON@@", sys.executable.encode())
+                             .replace(b"@@APP@@", app_path.encode()))
             
-            # Write the plist file
-            plist_path = os.path.join(launch_agents_dir, "com.user.screenshotutil.plist")
-            with open(plist_path, "w") as f:
-                f.write(plist_content)
+            plist_path = LAUNCH_AGENT_PATH
+            try:
+                with open(plist_path, "rb") as f:
+                    up_to_date = f.read() == plist_content
+            except FileNotFoundError:
+                up_to_date = False
+            
+            if up_to_date:
+                # launchd names the job it started us as in XPC_SERVICE_NAME
+                if os.environ.get("XPC_SERVICE_NAME") == LAUNCH_AGENT_LABEL:
+                    return
+            else:
+                # Create the LaunchAgents directory if it doesn't exist
+                os.makedirs(LAUNCH_AGENTS_DIR, exist_ok=True)
+                
+                # Write the plist file
+                fd = os.open(plist_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+                try:
+                    os.write(fd, plist_content)
+                finally:
+                    os.close(fd)
+                print(f"Launch agent created at {plist_path}")
             
             # Load the launch agent
             subprocess.run(["launchctl", "load", plist_path], check=True)
             
-            print(f"Launch agent created at {plist_path}")
-            
         except Exception as e:
             print(f"Error setting up launch agent: {e}")
-            import traceback
             traceback.print_exc()
     
     def remove_launch_agent(self):
-        """Remove launch agent to disable auto-launch at login"""
+        """Remove launch agent to disable auto-launch at login.
+        
+        This waits for launchctl, so the app runs it on _launch_agent_worker.
+        """
         try:
             # Get the path to the plist file
-            plist_path = os.path.expanduser("~/Library/LaunchAgents/com.user.screenshotutil.plist")
+            plist_path = LAUNCH_AGENT_PATH
             
             # Unload the launch agent if it exists
             if os.path.exists(plist_path):
@@ -588,7 +810,6 @@ class ScreenshotUtilService(rumps.App):
             
         except Exception as e:
             print(f"Error removing launch agent: {e}")
-            import traceback
             traceback.print_exc()
     
     def load_preferences(self):
@@ -596,21 +817,52 @@ class ScreenshotUtilService(rumps.App):
         try:
             # Check if preferences file exists
             if os.path.exists(self.preferences_path):
-                with open(self.preferences_path, "r") as f:
-                    return json.load(f)
+                return read_preferences(self.preferences_path)
             # Return default preferences if file doesn't exist
-            return DEFAULT_PREFERENCES.copy()
+            return default_preferences()
         except Exception as e:
             print(f"Error loading preferences: {e}")
-            return DEFAULT_PREFERENCES.copy()
+            return default_preferences()
     
     def save_preferences(self):
-        """Save preferences to file"""
+        """Save preferences to file.
+        
+        The write is debounced: a snapshot of the preferences is written once
+        no other save has been requested for SAVE_DELAY seconds, so toggling
+        several settings in a row costs a single write. Nothing is written
+        when the preferences match what was last loaded or saved.
+        """
+        with self._save_lock:
+            if self.preferences == self._saved_preferences:
+                # Unchanged, or changed back before the write happened
+                if self._save_timer is not None:
+                    self._save_timer.cancel()
+                    self._save_timer = None
+                self._pending_preferences = None
+                return
+            self._pending_preferences = copy.deepcopy(self.preferences)
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+            self._save_timer = threading.Timer(SAVE_DELAY, self.flush_preferences)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+    
+    def flush_preferences(self):
+        """Write any preferences still waiting on the save timer"""
+        with self._save_lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            preferences, self._pending_preferences = self._pending_preferences, None
+        if preferences is None:
+            return
         try:
-            with open(self.preferences_path, "w") as f:
-                json.dump(self.preferences, f, indent=4)
+            write_preferences(self.preferences_path, preferences)
         except Exception as e:
             print(f"Error saving preferences: {e}")
+            return
+        with self._save_lock:
+            self._saved_preferences = preferences
     
     def show_about(self, _):
         """Show about dialog"""
@@ -629,26 +881,31 @@ class ScreenshotUtilService(rumps.App):
         if self.hotkey_listener:
             self.hotkey_listener.stop()
         
-        # Make sure any subprocesses are terminated
-        try:
-            # This is a stronger approach to ensure we exit
-            # Find our own process group and terminate it
-            pid = os.getpid()
-            print(f"Terminating process ID: {pid}")
-            
-            # Kill all processes in our process group
-            # This will also prevent the LaunchAgent from auto-restarting since we're cleanly exiting
-            subprocess.run(["/usr/bin/pkill", "-f", "python.*screenshot-util"], 
-                           stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False)
-        except Exception as e:
-            print(f"Error cleaning up processes: {e}")
+        # Write any preference change that is still waiting to be saved
+        self.flush_preferences()
+        
+        # Make sure the capture processes we started are terminated, after
+        # any start still running on the worker has finished
+        self._capture_worker.shutdown(wait=True)
+        for proc in self._children:
+            if proc.poll() is not None:
+                continue
+            try:
+                proc.terminate()
+                try:
+                    proc.wait(timeout=1.0)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+            except Exception as e:
+                print(f"Error stopping capture process {proc.pid}: {e}")
         
         # Disable the LaunchAgent temporarily to prevent auto-restart
         try:
-            launch_agent = os.path.expanduser("~/Library/LaunchAgents/com.user.screenshotutil.plist")
+            launch_agent = LAUNCH_AGENT_PATH
             if os.path.exists(launch_agent):
-                subprocess.run(["launchctl", "unload", launch_agent], 
-                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False)
+                # Not waited on; launchctl finishes on its own after we exit
+                subprocess.Popen(["launchctl", "unload", launch_agent],
+                                 stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
         except Exception as e:
             print(f"Error disabling LaunchAgent: {e}")
         
@@ -664,8 +921,9 @@ def run_service():
     """Run the screenshot utility as a background service.
     
     Main entry point for starting the screenshot utility in service mode.
-    Creates a lock file to prevent multiple instances, initializes the
-    ScreenshotUtilService class, and handles cleanup on exit.
+    Initializes the ScreenshotUtilService class and handles errors on exit.
+    Multiple instances are prevented by the lock main.py holds while the
+    service runs.
     
     Returns:
         None. Exits the process on completion or error.
@@ -674,26 +932,6 @@ def run_service():
         # Add a unique identifying string that we can use to detect this process later
         print("Starting Screenshot Utility service with identifier: screenshot-service-instance")
         
-        # Create an ID file to mark this as the active service
-        service_lock_path = os.path.expanduser("~/.screenshot_util_service.lock")
-        try:
-            # Write our PID to the lock file
-            with open(service_lock_path, "w") as f:
-                f.write(str(os.getpid()))
-                
-            # Make sure to clean up the lock file on exit
-            import atexit
-            def cleanup_lock():
-                try:
-                    if os.path.exists(service_lock_path):
-                        os.remove(service_lock_path)
-                except:
-                    pass
-            atexit.register(cleanup_lock)
-        except Exception as e:
-            print(f"Error creating lock file: {e}")
-            # Continue anyway
-            
         # Start the service
         app = ScreenshotUtilService()
         app.run()
@@ -702,7 +940,6 @@ def run_service():
         sys.exit(0)
     except Exception as e:
         print(f"Error in service: {e}")
-        import traceback
         traceback.print_exc()
         sys.exit(1)
 
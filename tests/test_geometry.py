@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""
+Tests for the annotation geometry helpers
+"""
+import sys
+
+# Add src to path to import modules
+sys.path.append("src")
+from geometry import arrow_points, padded_bounds
+
+
+def test_arrow_points_horizontal():
+    """Test the arrow outline for a left-to-right arrow"""
+    stem, head = arrow_points(0, 0, 100, 0, 2)
+    assert stem == [(0, 3), (80, 3), (80, -3), (0, -3)]
+    assert head == [(100, 0), (83, 10), (83, -10)]
+
+
+def test_arrow_points_zero_length():
+    """Test that an arrow with no length has no outline"""
+    assert arrow_points(5, 5, 5, 5, 2) is None
+
+
+def test_padded_bounds():
+    """Test that the bounds cover every point plus the margin"""
+    assert padded_bounds([(10, 20), (4, 30), (7.5, 25)], 2) == (2, 18, 11, 15)
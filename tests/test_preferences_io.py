@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Tests for reading and writing the preferences file
+"""
+import os
+import sys
+import json
+
+import pytest
+
+# Add src to path to import modules
+sys.path.append("src")
+import preferences_io
+from preferences_io import dumps_preferences, read_preferences, write_preferences
+
+
+def test_read_preferences_returns_private_copy(tmp_path):
+    """Test that changes to a read result don't leak into later reads"""
+    path = tmp_path / "prefs.json"
+    path.write_text(json.dumps({"hotkey": {"key": "4", "modifiers": ["command"]}}))
+
+    first = read_preferences(str(path))
+    first["hotkey"]["modifiers"].append("shift")
+
+    assert read_preferences(str(path))["hotkey"]["modifiers"] == ["command"]
+
+
+def test_read_preferences_sees_updates(tmp_path):
+    """Test that a rewritten file is parsed again"""
+    path = tmp_path / "prefs.json"
+    path.write_text(json.dumps({"auto_launch": True}))
+    assert read_preferences(str(path)) == {"auto_launch": True}
+
+    path.write_text(json.dumps({"auto_launch": False}))
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert read_preferences(str(path)) == {"auto_launch": False}
+
+
+def test_write_preferences_skips_unchanged(tmp_path):
+    """Test that writing identical preferences leaves the file alone"""
+    path = str(tmp_path / "prefs.json")
+    preferences = {"hotkey": {"key": "4", "modifiers": ["command", "shift"]}}
+
+    assert write_preferences(path, preferences)
+    assert read_preferences(path) == preferences
+    assert not write_preferences(path, preferences)
+    assert not os.path.exists(path + ".tmp")
+
+
+def test_dumps_preferences_same_bytes_without_orjson(monkeypatch):
+    """Test that the json fallback encodes exactly like orjson"""
+    pytest.importorskip("orjson")
+    preferences = {"hotkey": {"key": "4", "modifiers": ["command"]}, "save_location": "~/Écrans", "empty": {}}
+
+    with_orjson = dumps_preferences(preferences)
+    monkeypatch.setattr(preferences_io, "orjson", None)
+
+    assert dumps_preferences(preferences) == with_orjson
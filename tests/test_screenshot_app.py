@@ -7,6 +7,8 @@ import pytest
 from unittest.mock import MagicMock, patch
 from PyQt6.QtWidgets import QApplication
 from PyQt6.QtCore import Qt, QPoint
+from PyQt6.QtGui import QColor
+from PIL import Image
 
 # Add src to path to import modules
 sys.path.append("src")
@@ -22,12 +24,19 @@ def app():
     yield app
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def screenshot_app(app):
-    """Create a ScreenshotApp instance for tests"""
+    """Create a ScreenshotApp instance shared by the tests in this module"""
     return ScreenshotApp()
 
 
+@pytest.fixture(autouse=True)
+def reset_screenshot_app(screenshot_app):
+    """Reset the shared ScreenshotApp's state before each test"""
+    screenshot_app.annotation_window = None
+    yield
+
+
 def test_screenshot_app_init(screenshot_app):
     """Test initialization of ScreenshotApp"""
     assert screenshot_app.windowTitle() == "Screenshot Utility"
@@ -35,10 +44,10 @@ def test_screenshot_app_init(screenshot_app):
     assert screenshot_app.annotation_window is None
 
 
-def test_start_capture(screenshot_app):
+def test_start_capture(screenshot_app, monkeypatch):
     """Test starting the capture process"""
     # Mock the screen_capture start_capture method
-    screenshot_app.screen_capture.start_capture = MagicMock()
+    monkeypatch.setattr(screenshot_app.screen_capture, "start_capture", MagicMock())
     
     # Call start_capture
     screenshot_app.start_capture()
@@ -47,22 +56,11 @@ def test_start_capture(screenshot_app):
     screenshot_app.screen_capture.start_capture.assert_called_once()
 
 
-def test_on_capture_complete_with_screenshot(screenshot_app, monkeypatch):
-    """Test capture complete with a screenshot"""
-    # Skip the whole test if it's getting too complex
-    # This approach is acceptable when the test isn't critical and testing UI is complex
-    import pytest
-    pytest.skip("Skipping test due to complex UI mocking requirements")
-    
-    # The actual test would be here if we could make the mocking work properly
-    # For now we're skipping it rather than dealing with complex UI testing
-
-
 def test_on_capture_complete_without_screenshot(screenshot_app, monkeypatch):
     """Test capture complete without a screenshot"""
     # Mock statusBar to verify it's called
     mock_status_bar = MagicMock()
-    screenshot_app.statusBar = MagicMock(return_value=mock_status_bar)
+    monkeypatch.setattr(screenshot_app, "statusBar", MagicMock(return_value=mock_status_bar))
     
     # Call on_capture_complete with None
     screenshot_app.on_capture_complete(None)
@@ -71,4 +69,13 @@ def test_on_capture_complete_without_screenshot(screenshot_app, monkeypatch):
     assert screenshot_app.annotation_window is None
     
     # Verify statusBar was called with our message
-    mock_status_bar.showMessage.assert_called_once()
\ No newline at end of file
+    mock_status_bar.showMessage.assert_called_once()
+
+
+def test_drawing_area_keeps_rgba_pixels(app):
+    """Test that a DrawingArea built from an RGBA PIL image shows its pixels"""
+    drawing_area = DrawingArea(Image.new("RGBA", (64, 64), (10, 20, 30, 255)))
+    
+    # The packed buffer is released after conversion, so the pixmap must own its pixels
+    color = drawing_area.pixmap.toImage().pixelColor(5, 5)
+    assert color == QColor(10, 20, 30, 255)